@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from rest_framework.serializers import BaseSerializer
+
+        from . import signals  # noqa: F401
+        from .metrics import timed_serializer_data
+
+        BaseSerializer.data = timed_serializer_data(BaseSerializer.data)
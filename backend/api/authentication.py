@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from copy import copy
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .metrics import TOKEN_CACHE
+
+SHARED_TOKEN_KEY = 'auth_token:{}'
+
+
+class TokenCache:
+    """Bounded LRU of token key -> user snapshot with a short TTL.
+
+    Entries are dropped on logout, password change and deactivation in
+    this process and in the shared cache; other workers' copies expire
+    within ``TOKEN_CACHE_TTL`` seconds.
+    """
+
+    def __init__(self, size, ttl, shared=False):
+        self.size = size
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                TOKEN_CACHE.labels('local').inc()
+                return copy(entry[0])
+            self._entries.pop(key, None)
+        user = cache.get(SHARED_TOKEN_KEY.format(key)) if self.shared else None
+        if user is not None:
+            self.hits += 1
+            TOKEN_CACHE.labels('shared').inc()
+            self._remember(key, user)
+            return copy(user)
+        self.misses += 1
+        TOKEN_CACHE.labels('miss').inc()
+        return None
+
+    def set(self, key, user):
+        self._remember(key, user)
+        if self.shared:
+            cache.set(SHARED_TOKEN_KEY.format(key), user, timeout=self.ttl)
+
+    def discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared:
+            cache.delete_many([SHARED_TOKEN_KEY.format(key) for key in keys])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key, user):
+        with self._lock:
+            self._entries[key] = (copy(user), monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(
+    settings.TOKEN_CACHE_SIZE,
+    settings.TOKEN_CACHE_TTL,
+    settings.TOKEN_CACHE_SHARED,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that skips the token query on cache hits."""
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return user, token
@@ -0,0 +1,120 @@
+from calendar import timegm
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from rest_framework.response import Response
+
+from recipes.catalog import catalog_version, purge_epoch, surrogate_versions
+
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Vary')
+
+
+def conditional_get(validators, vary=()):
+    """Answer a view method with 304 when the client copy is current.
+
+    ``validators(view, request, *args, **kwargs)`` returns an
+    ``(etag, last_modified)`` pair and must not serialize anything, so
+    the comparison happens before the serializer runs.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = validators(self, request, *args, **kwargs)
+            etag = etag and quote_etag(etag)
+            timestamp = last_modified and timegm(last_modified.utctimetuple())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            patch_vary_headers(response, vary)
+            if getattr(request, 'stale_fragments', False):
+                return response
+            if etag:
+                response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+            return response
+        return wrapper
+    return decorator
+
+
+def catalog_validators(name):
+    def validators(view, request, *args, **kwargs):
+        return catalog_version(name), None
+    return validators
+
+
+def response_cache_key(request):
+    # Bodies hold absolute media and pagination URLs, so the origin the
+    # client used is part of the key.
+    query = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    return 'response:' + md5(repr((
+        request.build_absolute_uri('/'), request.path, query
+    )).encode()).hexdigest()
+
+
+def cache_anonymous(surrogate_keys):
+    """Serve anonymous GET/HEAD responses from the ``responses`` cache.
+
+    ``surrogate_keys(view, request, data)`` names everything the
+    serialized ``data`` shows (``recipe:<id>``, ``author:<id>``, ...);
+    purging any of them drops the entry. The keys are only known once
+    the body is built, so a response is not stored when anything was
+    purged while it was built, or when it includes stale fragments.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or not request.user.is_anonymous
+            ):
+                return method(self, request, *args, **kwargs)
+            store = caches['responses']
+            key = response_cache_key(request)
+            entry = store.get(key)
+            if entry is not None and (
+                surrogate_versions(entry['versions']) == entry['versions']
+            ):
+                headers = entry['headers']
+                response = get_conditional_response(
+                    request,
+                    etag=headers.get('ETag'),
+                    last_modified=parse_http_date_safe(
+                        headers.get('Last-Modified')
+                    ),
+                ) or Response(entry['data'])
+                for header, value in headers.items():
+                    response[header] = value
+                return response
+
+            epoch = purge_epoch()
+            response = method(self, request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not getattr(request, 'stale_fragments', False)
+                and purge_epoch() == epoch
+            ):
+                store.set(key, {
+                    'data': response.data,
+                    'headers': {
+                        header: response[header] for header in CACHED_HEADERS
+                        if response.has_header(header)
+                    },
+                    'versions': surrogate_versions(
+                        surrogate_keys(self, request, response.data)
+                    ),
+                })
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,71 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.template.defaultfilters import filesizeformat
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image, UnidentifiedImageError
+from rest_framework.fields import ImageField, ReadOnlyField
+from rest_framework.serializers import ValidationError
+
+
+class ImageRenditionsField(ReadOnlyField):
+    """URLs of the resized recipe pictures, grouped by size and format.
+
+    Empty until the background worker has built them.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = 'renditions'
+        super().__init__(**kwargs)
+
+    def to_representation(self, renditions):
+        request = self.context.get('request')
+        urls = {}
+        for name, formats in renditions.get('files', {}).items():
+            urls[name] = {}
+            for extension, path in formats.items():
+                url = default_storage.url(path)
+                urls[name][extension] = (
+                    request.build_absolute_uri(url) if request else url
+                )
+        return urls
+
+
+class UploadableImageField(Base64ImageField):
+    """Accepts a base64 string or a multipart file upload.
+
+    Size and pixel dimensions are checked from the upload metadata and
+    the image header, before the picture is fully decoded.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, UploadedFile):
+            if len(str(data)) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE:
+                self.fail_too_large()
+            return super().to_internal_value(data)
+        if getattr(data, 'too_large', False) or (
+            data.size > settings.RECIPE_IMAGE_MAX_SIZE
+        ):
+            self.fail_too_large()
+        try:
+            image = Image.open(data)
+        except (UnidentifiedImageError, OSError):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        if image.format.lower() not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        if max(image.size) > settings.RECIPE_IMAGE_MAX_DIMENSION:
+            raise ValidationError(
+                f'Image must not exceed '
+                f'{settings.RECIPE_IMAGE_MAX_DIMENSION} px per side.'
+            )
+        data.seek(0)
+        data.name = f'{uuid4()}.{image.format.lower()}'
+        return ImageField.to_internal_value(self, data)
+
+    def fail_too_large(self):
+        raise ValidationError(
+            f'Image must not exceed '
+            f'{filesizeformat(settings.RECIPE_IMAGE_MAX_SIZE)}.'
+        )
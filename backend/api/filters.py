@@ -1,13 +1,30 @@
 from django_filters.rest_framework import FilterSet, filters
+from rest_framework.exceptions import ValidationError
 
-from recipes.models import Ingredient, Recipe
+from recipes.models import Recipe
+from recipes.search import search_recipes
+from recipes.tag_registry import tag_choices, tag_registry
 
 from users.models import User
 
+from .pagination import KeysetPagination
+
+RANKINGS = {
+    'popular': ('-favorites_count', '-id'),
+    'trending': ('-trending_score', '-id'),
+}
+
 
 class RecipeFilter(FilterSet):
     author = filters.ModelChoiceFilter(queryset=User.objects.all())
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.MultipleChoiceFilter(
+        choices=tag_choices, method='filter_tags'
+    )
+    search = filters.CharFilter(method='filter_search')
+    ordering = filters.ChoiceFilter(
+        choices=[(ranking, ranking) for ranking in RANKINGS],
+        method='filter_ordering',
+    )
 
     class Meta:
         model = Recipe
@@ -16,10 +33,25 @@ class RecipeFilter(FilterSet):
             'cart',
         )
 
-
-class IngredientSearchFilter(FilterSet):
-    name = filters.CharFilter(lookup_expr='istartswith')
-
-    class Meta:
-        model = Ingredient
-        fields = ('name',)
+    def filter_tags(self, queryset, name, slugs):
+        tagged = Recipe.tags.through.objects.filter(
+            tag_id__in=tag_registry.ids_for_slugs(slugs)
+        )
+        return queryset.filter(id__in=tagged.values('recipe_id'))
+
+    def reject_cursor(self, name):
+        # Keyset pages seek on the id and would silently drop any other
+        # order; scores also move between requests, so a cursor over a
+        # ranking would skip and repeat recipes.
+        if KeysetPagination.cursor_query_param in self.request.query_params:
+            raise ValidationError(
+                {name: ['Ranked lists are paged with page/limit only.']}
+            )
+
+    def filter_search(self, queryset, name, query):
+        self.reject_cursor(name)
+        return search_recipes(queryset, query)
+
+    def filter_ordering(self, queryset, name, ranking):
+        self.reject_cursor(name)
+        return queryset.order_by(*RANKINGS[ranking])
@@ -0,0 +1,123 @@
+from time import monotonic, sleep, time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from recipes.catalog import surrogate_versions
+
+FRAGMENT_KEY = 'recipe_fragment:{}:{}'
+FILL_LOCK_KEY = 'recipe_fragment_fill:{}:{}'
+FILL_LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.02
+
+
+def fragment_surrogate_keys(recipe):
+    return (
+        f'recipe:{recipe.pk}',
+        f'author:{recipe.author_id}',
+        'tags',
+        'ingredients',
+    )
+
+
+def fragment_stamp(recipe):
+    """Row values an entry must have been built from to be reused.
+
+    A reader on a lagging replica, or one that loaded its rows just
+    before an edit was purged, fills entries from older rows under the
+    new version tokens; the stamp keeps those away from newer readers.
+    """
+    return recipe.updated_at, recipe.favorites_count
+
+
+def matching(entry, recipe):
+    """``entry`` if it was built from the loaded row of ``recipe``."""
+    if entry is not None and entry.get('stamp') == fragment_stamp(recipe):
+        return entry
+    return None
+
+
+def wait_for_fill(store, keys):
+    """Poll for entries another request is filling, up to the fill wait."""
+    filled = {}
+    deadline = monotonic() + settings.RECIPE_FRAGMENT_FILL_WAIT
+    while len(filled) < len(keys) and monotonic() < deadline:
+        sleep(POLL_INTERVAL)
+        filled.update(store.get_many(
+            [key for key in keys if key not in filled]
+        ))
+    return filled
+
+
+def recipe_fragments(recipes, origin, build):
+    """User-independent serialized bodies of ``recipes``, keyed by id.
+
+    ``build(recipes)`` serializes the recipes it is given. An entry is
+    stale once its soft TTL passes or any of its surrogate keys is
+    purged. Only the request that wins the fill lock rebuilds a stale
+    entry, the others keep serving the stale copy meanwhile; cold
+    misses wait briefly for a concurrent fill before building their own.
+
+    Returns the bodies and whether any of them was served stale.
+    """
+    store = caches['responses']
+    keys = {recipe.pk: FRAGMENT_KEY.format(origin, recipe.pk)
+            for recipe in recipes}
+    entries = store.get_many(keys.values())
+    versions = surrogate_versions({
+        key for recipe in recipes for key in fragment_surrogate_keys(recipe)
+    })
+
+    fragments, refill, cold, locked, stale = {}, [], [], [], []
+    now = time()
+    for recipe in recipes:
+        entry = matching(entries.get(keys[recipe.pk]), recipe)
+        if entry is not None:
+            fragments[recipe.pk] = entry['data']
+            if entry['fresh_until'] > now and all(
+                entry['versions'].get(key) == versions[key]
+                for key in fragment_surrogate_keys(recipe)
+            ):
+                continue
+        if store.add(
+            FILL_LOCK_KEY.format(origin, recipe.pk), True, FILL_LOCK_TIMEOUT
+        ):
+            refill.append(recipe)
+            locked.append(recipe)
+        elif entry is None:
+            cold.append(recipe)
+        else:
+            stale.append(recipe)
+
+    if cold:
+        filled = wait_for_fill(store, [keys[recipe.pk] for recipe in cold])
+        for recipe in cold:
+            entry = matching(filled.get(keys[recipe.pk]), recipe)
+            if entry is not None:
+                fragments[recipe.pk] = entry['data']
+            else:
+                refill.append(recipe)
+
+    if refill:
+        built = build(refill)
+        fresh_until = time() + settings.RECIPE_FRAGMENT_TTL
+        store.set_many(
+            {
+                keys[recipe.pk]: {
+                    'data': built[recipe.pk],
+                    'versions': {
+                        key: versions[key]
+                        for key in fragment_surrogate_keys(recipe)
+                    },
+                    'fresh_until': fresh_until,
+                    'stamp': fragment_stamp(recipe),
+                }
+                for recipe in refill
+            },
+            timeout=settings.RECIPE_FRAGMENT_STALE_TTL,
+        )
+        store.delete_many([
+            FILL_LOCK_KEY.format(origin, recipe.pk) for recipe in locked
+        ])
+        fragments.update(built)
+    return fragments, bool(stale)
@@ -0,0 +1,121 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from prometheus_client import (CollectorRegistry, Counter, Histogram,
+                               REGISTRY, generate_latest, multiprocess)
+
+# Inside gunicorn every worker writes its samples to
+# PROMETHEUS_MULTIPROC_DIR and the exporter merges them on scrape.
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+REQUESTS = Counter(
+    'foodgram_requests_total',
+    'Requests served.',
+    ('view', 'method', 'status'),
+)
+LATENCY = Histogram(
+    'foodgram_request_latency_seconds',
+    'Time to build a response.',
+    ('view', 'method'),
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries',
+    'SQL queries per request.',
+    ('view', 'method'),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, float('inf')),
+)
+DB_TIME = Histogram(
+    'foodgram_db_time_seconds',
+    'Time spent in SQL per request.',
+    ('view', 'method'),
+)
+SERIALIZER_TIME = Histogram(
+    'foodgram_serializer_time_seconds',
+    'Time spent serializing per request.',
+    ('view', 'method'),
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Size of non-streaming response bodies.',
+    ('view', 'method'),
+    buckets=tuple(2 ** power for power in range(8, 24, 2)) + (float('inf'),),
+)
+TOKEN_CACHE = Counter(
+    'foodgram_token_cache_requests_total',
+    'Token authentication lookups by cache outcome.',
+    ('result',),
+)
+
+_serializer_timer = ContextVar('serializer_timer', default=None)
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts queries and sums their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+class SerializerTimer:
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+
+@contextmanager
+def serializer_timing():
+    timer = SerializerTimer()
+    token = _serializer_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _serializer_timer.reset(token)
+
+
+def timed_serializer_data(data):
+    """Wrap ``BaseSerializer.data`` to time the outermost serializer."""
+    @property
+    @wraps(data.fget)
+    def wrapper(self):
+        timer = _serializer_timer.get()
+        if timer is None:
+            return data.fget(self)
+        timer.depth += 1
+        start = perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            timer.depth -= 1
+            if not timer.depth:
+                timer.duration += perf_counter() - start
+    return wrapper
+
+
+def observe_request(view, method, response, latency, queries, serializer):
+    REQUESTS.labels(view, method, response.status_code).inc()
+    LATENCY.labels(view, method).observe(latency)
+    DB_QUERIES.labels(view, method).observe(queries.count)
+    DB_TIME.labels(view, method).observe(queries.duration)
+    SERIALIZER_TIME.labels(view, method).observe(serializer.duration)
+    if not response.streaming:
+        RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+
+
+def export_metrics():
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
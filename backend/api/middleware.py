@@ -0,0 +1,29 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.db import connections
+
+from .metrics import QueryTimer, observe_request, serializer_timing
+
+
+class MetricsMiddleware:
+    """Records latency, SQL, serializer and size metrics per DRF route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            serializer = stack.enter_context(serializer_timing())
+            start = perf_counter()
+            response = self.get_response(request)
+            latency = perf_counter() - start
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unmatched'
+        observe_request(
+            view, request.method, response, latency, queries, serializer
+        )
+        return response
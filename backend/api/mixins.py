@@ -0,0 +1,36 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_routers import (is_pinned, pin_to_primary, replica_configured,
+                         replica_reads)
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from the replica, with read-your-writes.
+
+    Authentication runs on the primary; after it, GET/HEAD/OPTIONS go
+    to the replica unless the user wrote something recently. Successful
+    writes pin the user to the primary for ``REPLICA_PIN_SECONDS``.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = replica_reads.set(False)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+        user = getattr(self.request, 'user', None)
+        if (
+            replica_configured() and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None and user.is_authenticated
+        ):
+            pin_to_primary(user.id)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        replica_reads.set(
+            replica_configured() and request.method in SAFE_METHODS and not (
+                request.user.is_authenticated and is_pinned(request.user.id)
+            )
+        )
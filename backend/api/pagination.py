@@ -0,0 +1,49 @@
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+
+
+class PageLimitPagination(PageNumberPagination):
+    page_size_query_param = 'limit'
+
+
+class KeysetPagination(CursorPagination):
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+
+
+class FeedPagination(KeysetPagination):
+    ordering = ('-id',)
+
+
+class PageOrCursorPagination(BasePagination):
+    """Page/limit pagination, switched to keyset mode by ``?cursor=``.
+
+    Keyset pages skip ``COUNT(*)`` and ``OFFSET`` and seek on the
+    primary key, so deep pages cost the same as the first one.
+    """
+    cursor_query_param = KeysetPagination.cursor_query_param
+
+    def __init__(self):
+        self.page_paginator = PageLimitPagination()
+        self.cursor_paginator = KeysetPagination()
+        self.paginator = self.page_paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_paginator
+        else:
+            self.paginator = self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_paginator.get_schema_operation_parameters(view) + [
+            parameter for parameter
+            in self.cursor_paginator.get_schema_operation_parameters(view)
+            if parameter['name'] == self.cursor_query_param
+        ]
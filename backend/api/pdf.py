@@ -0,0 +1,207 @@
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+from reportlab.pdfbase.ttfonts import TTFontFile, makeToUnicodeCMap
+
+FONT_PATH = Path(__file__).resolve().parent / 'fonts' / 'DejaVuSans.ttf'
+# A4 in points.
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 56
+FONT_SIZE = 12
+LEADING = 16
+# Simple TrueType fonts address at most 256 characters each.
+SUBSET_SIZE = 256
+# Pages point at these before they are written at the end.
+CATALOG, PAGES, RESOURCES = 1, 2, 3
+FLAG_SYMBOLIC = 4
+FLAG_NONSYMBOLIC = 32
+
+subset_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def font_face():
+    return TTFontFile(str(FONT_PATH))
+
+
+def subset_tag(number):
+    """Six capital letters that prefix the name of an embedded subset."""
+    return ''.join(chr(ord('A') + number // 26 ** digit % 26)
+                   for digit in range(5, -1, -1))
+
+
+class PDFDocument:
+    """A single-column text document written out page by page.
+
+    Each page is returned as soon as it is full, so the caller can send
+    it before the next one is laid out. The font subsets only need the
+    characters actually used, so they are written after the last page
+    together with the page tree and the cross-reference table.
+    """
+
+    def __init__(self):
+        self.face = font_face()
+        self.offset = 0
+        self.offsets = {}
+        self.last_id = RESOURCES
+        self.pages = []
+        self.codes = {}
+        self.subsets = []
+        self.content = []
+        self.y = PAGE_HEIGHT - MARGIN - FONT_SIZE
+
+    def allocate(self):
+        self.last_id += 1
+        return self.last_id
+
+    def write(self, number, body):
+        self.offsets[number] = self.offset
+        chunk = b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        self.offset += len(chunk)
+        return chunk
+
+    def write_stream(self, content, entries=b''):
+        data = zlib.compress(content)
+        return self.write(self.allocate(), b'<< /Length %d /Filter '
+                          b'/FlateDecode %s>>\nstream\n%s\nendstream'
+                          % (len(data), entries, data))
+
+    def start(self):
+        header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+        self.offset = len(header)
+        return header
+
+    def char_width(self, code):
+        return self.face.charWidths.get(code, self.face.defaultWidth)
+
+    def width(self, text):
+        return sum(map(self.char_width, map(ord, text))) * FONT_SIZE / 1000
+
+    def wrap(self, text):
+        """Split text into lines that fit between the margins."""
+        lines, line = [], ''
+        for word in text.split(' '):
+            candidate = f'{line} {word}' if line else word
+            if line and self.width(candidate) > PAGE_WIDTH - 2 * MARGIN:
+                lines.append(line)
+                candidate = word
+            line = candidate
+        return lines + [line]
+
+    def code(self, char):
+        """Subset and character code of ``char``, assigned on first use."""
+        if ord(char) not in self.face.charToGlyph:
+            char = '?'
+        if char not in self.codes:
+            if not self.subsets or len(self.subsets[-1]) == SUBSET_SIZE:
+                self.subsets.append([])
+            self.codes[char] = (
+                len(self.subsets) - 1, len(self.subsets[-1])
+            )
+            self.subsets[-1].append(ord(char))
+        return self.codes[char]
+
+    def show(self, text):
+        runs = []
+        for subset, code in map(self.code, text):
+            if not runs or runs[-1][0] != subset:
+                runs.append((subset, bytearray()))
+            runs[-1][1].append(code)
+        return b''.join(
+            b'/F%d %d Tf <%s> Tj ' % (subset, FONT_SIZE, codes.hex().encode())
+            for subset, codes in runs
+        )
+
+    def line(self, text=''):
+        """Lay out a paragraph; returns the pages it completed, if any."""
+        chunks = []
+        for row in self.wrap(text):
+            if self.y < MARGIN:
+                chunks.append(self.finish_page())
+            self.content.append(
+                b'BT %d %d Td %sET' % (MARGIN, self.y, self.show(row))
+            )
+            self.y -= LEADING
+        return b''.join(chunks)
+
+    def finish_page(self):
+        chunk = self.write_stream(b'\n'.join(self.content))
+        contents = self.last_id
+        page = self.allocate()
+        self.pages.append(page)
+        self.content = []
+        self.y = PAGE_HEIGHT - MARGIN - FONT_SIZE
+        return chunk + self.write(page, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources %d 0 R /Contents %d 0 R >>'
+        ) % (PAGES, PAGE_WIDTH, PAGE_HEIGHT, RESOURCES, contents))
+
+    def write_font(self, number, subset):
+        name = f'{subset_tag(number)}+{self.face.name.decode()}'
+        with subset_lock:
+            program = self.face.makeSubset(subset)
+        chunks = [self.write_stream(program, b'/Length1 %d ' % len(program))]
+        program_id = self.last_id
+        descriptor = self.allocate()
+        chunks.append(self.write(descriptor, (
+            b'<< /Type /FontDescriptor /FontName /%s /Flags %d '
+            b'/FontBBox [%s] /ItalicAngle %g /Ascent %g /Descent %g '
+            b'/CapHeight %g /StemV %d /FontFile2 %d 0 R >>'
+        ) % (
+            name.encode(),
+            self.face.flags & ~FLAG_NONSYMBOLIC | FLAG_SYMBOLIC,
+            b' '.join(b'%g' % value for value in self.face.bbox),
+            self.face.italicAngle, self.face.ascent, self.face.descent,
+            self.face.capHeight, self.face.stemV, program_id,
+        )))
+        chunks.append(self.write_stream(
+            makeToUnicodeCMap(name, subset).encode()
+        ))
+        to_unicode = self.last_id
+        font = self.allocate()
+        chunks.append(self.write(font, (
+            b'<< /Type /Font /Subtype /TrueType /BaseFont /%s '
+            b'/FirstChar 0 /LastChar %d /Widths [%s] '
+            b'/FontDescriptor %d 0 R /ToUnicode %d 0 R >>'
+        ) % (
+            name.encode(), len(subset) - 1,
+            b' '.join(b'%g' % self.char_width(code) for code in subset),
+            descriptor, to_unicode,
+        )))
+        return font, b''.join(chunks)
+
+    def finish(self):
+        """Close the last page and write fonts, page tree and trailer."""
+        chunks = [self.finish_page()]
+        fonts = []
+        for number, subset in enumerate(self.subsets):
+            font, chunk = self.write_font(number, subset)
+            fonts.append(b'/F%d %d 0 R' % (number, font))
+            chunks.append(chunk)
+        chunks.append(self.write(
+            RESOURCES, b'<< /Font << %s >> >>' % b' '.join(fonts)
+        ))
+        chunks.append(self.write(
+            PAGES, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+                b' '.join(b'%d 0 R' % page for page in self.pages),
+                len(self.pages),
+            )
+        ))
+        chunks.append(self.write(
+            CATALOG, b'<< /Type /Catalog /Pages %d 0 R >>' % PAGES
+        ))
+        chunks.append(b'xref\n0 %d\n0000000000 65535 f \n' % (
+            self.last_id + 1
+        ))
+        chunks.extend(
+            b'%010d 00000 n \n' % self.offsets[number]
+            for number in range(1, self.last_id + 1)
+        )
+        chunks.append(
+            b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+            % (self.last_id + 1, CATALOG, self.offset)
+        )
+        return b''.join(chunks)
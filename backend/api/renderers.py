@@ -0,0 +1,118 @@
+import csv
+import json
+from datetime import datetime as dt
+
+from rest_framework.renderers import BaseRenderer
+
+from .pdf import PDFDocument
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """Renders the shopping list chunk by chunk for a streaming response.
+
+    ``ingredients`` is an iterator of dicts with ``ingredient``,
+    ``measure`` and ``amount`` keys.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error payloads (e.g. 401) go through regular rendering.
+        return json.dumps(data, ensure_ascii=False).encode()
+
+    def stream(self, user, ingredients):
+        raise NotImplementedError
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, user, ingredients):
+        yield (
+            f'Shopping_list for:\n\n{user.first_name}\n\n'
+            f'{dt.now().strftime("%d/%m/%Y %H:%M")}\n\n'
+        )
+        for ing in ingredients:
+            yield f'{ing["ingredient"]}: {ing["amount"]} {ing["measure"]}\n'
+        yield '\n\nCounted in Foodgram'
+
+
+class EchoBuffer:
+    def write(self, value):
+        return value
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, user, ingredients):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(('ingredient', 'amount', 'measurement_unit'))
+        for ing in ingredients:
+            yield writer.writerow(
+                (ing['ingredient'], ing['amount'], ing['measure'])
+            )
+
+
+class ShoppingListJSONRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, user, ingredients):
+        yield '{"user": %s, "ingredients": [' % json.dumps(
+            user.username, ensure_ascii=False
+        )
+        separator = ''
+        for ing in ingredients:
+            yield separator + json.dumps(
+                {
+                    'name': ing['ingredient'],
+                    'amount': ing['amount'],
+                    'measurement_unit': ing['measure'],
+                },
+                ensure_ascii=False,
+            )
+            separator = ', '
+        yield ']}'
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def stream(self, user, ingredients):
+        document = PDFDocument()
+        yield document.start()
+        for line in (
+            'Shopping_list for:', '', user.first_name, '',
+            dt.now().strftime('%d/%m/%Y %H:%M'), '',
+        ):
+            yield document.line(line)
+        for ing in ingredients:
+            yield document.line(
+                f'{ing["ingredient"]}: {ing["amount"]} {ing["measure"]}'
+            )
+        yield document.line()
+        yield document.line('Counted in Foodgram')
+        yield document.finish()
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+SHOPPING_LIST_RENDERERS = (
+    ShoppingListTextRenderer,
+    ShoppingListCSVRenderer,
+    ShoppingListJSONRenderer,
+    ShoppingListPDFRenderer,
+)
@@ -1,16 +1,23 @@
 from django.contrib.auth import get_user_model
-from django.db.models import F
+from django.db import transaction
+from django.db.models import F, Manager, Prefetch, prefetch_related_objects
 
 from drf_extra_fields.fields import Base64ImageField
-from rest_framework.serializers import (ModelSerializer,
+from rest_framework.serializers import (ListSerializer, ModelSerializer,
                                         PrimaryKeyRelatedField,
                                         SerializerMethodField,
                                         ValidationError)
 from rest_framework.permissions import AllowAny
 
-from recipes.models import Ingredient, Recipe, Tag
-from users.serializers import UserSerializer
-from .services import create_ingredients, is_hex_color, value_validate
+from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
+                            ShoppingCart, Tag)
+from recipes.services import recipe_ingredients_changed
+from recipes.similarity import schedule_similarity
+from users.serializers import UserSerializer, subscribed_authors
+from .fragments import recipe_fragments
+from .fields import ImageRenditionsField, UploadableImageField
+from .services import (create_ingredients, is_hex_color, list_value,
+                       objects_validate, update_ingredients, value_validate)
 
 User = get_user_model()
 
@@ -36,13 +43,27 @@ class IngredientSerializer(ModelSerializer):
         read_only_fields = '__all__',
 
 
+class RecipeFragmentListSerializer(ListSerializer):
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        self.child.load_fragments(recipes)
+        return super().to_representation(recipes)
+
+
 class RecipeListSerializer(ModelSerializer):
+    """Cached user-independent recipe body plus the per-user flags.
+
+    Bodies come from ``recipe_fragments``; ``is_favorited``,
+    ``is_in_shopping_cart`` and ``author.is_subscribed`` are overlaid
+    from three set lookups per page.
+    """
     tags = TagSerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
     ingredients = SerializerMethodField()
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
     image = Base64ImageField()
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
@@ -53,36 +74,97 @@ class RecipeListSerializer(ModelSerializer):
             'ingredients',
             'tags',
             'image',
+            'image_renditions',
             'text',
             'cooking_time',
             'is_favorited',
             'is_in_shopping_cart',
+            'favorites_count',
         )
         read_only_fields = (
             'is_favorited',
             'is_in_shopping_cart'
         )
+        list_serializer_class = RecipeFragmentListSerializer
 
-    def get_ingredients(self, obj):
-        ingredients = obj.ingredients.values(
-            'id', 'name', 'measurement_unit', amount=F('ingredients__amount')
+    def load_fragments(self, recipes):
+        request = self.context['request']
+        self._fragments, stale = recipe_fragments(
+            recipes, request.build_absolute_uri('/'), self.build_fragments
         )
-        return ingredients
+        if stale:
+            # Validators and response caching must not vouch for a body
+            # older than what they were computed from.
+            request.stale_fragments = True
+        user = request.user
+        if user.is_anonymous:
+            self._favorited = self._in_cart = set()
+            return
+        ids = [recipe.pk for recipe in recipes]
+        self._favorited = set(Favorite.objects.filter(
+            user=user, recipe_id__in=ids
+        ).values_list('recipe_id', flat=True))
+        self._in_cart = set(ShoppingCart.objects.filter(
+            user=user, recipe_id__in=ids
+        ).values_list('recipe_id', flat=True))
+
+    def build_fragments(self, recipes):
+        prefetch_related_objects(
+            recipes,
+            'tags',
+            Prefetch(
+                'recipes',
+                queryset=IngredientAmount.objects.select_related(
+                    'ingredients'
+                ).order_by('ingredients__name'),
+            ),
+        )
+        return {
+            recipe.pk: super(RecipeListSerializer, self).to_representation(
+                recipe
+            )
+            for recipe in recipes
+        }
+
+    def to_representation(self, instance):
+        if instance.pk not in getattr(self, '_fragments', {}):
+            self.load_fragments([instance])
+        fragment = self._fragments[instance.pk]
+        return {
+            **fragment,
+            'author': {
+                **fragment['author'],
+                'is_subscribed': fragment['author']['id'] in (
+                    subscribed_authors(self.context)
+                ),
+            },
+            'is_favorited': instance.pk in self._favorited,
+            'is_in_shopping_cart': instance.pk in self._in_cart,
+        }
+
+    def get_ingredients(self, obj):
+        return [
+            {
+                'id': amount.ingredients.id,
+                'name': amount.ingredients.name,
+                'measurement_unit': amount.ingredients.measurement_unit,
+                'amount': amount.amount,
+            }
+            for amount in obj.recipes.all()
+        ]
 
     def get_is_favorited(self, obj):
-        return getattr(obj, 'is_favorited', False)
+        return False
 
     def get_is_in_shopping_cart(self, obj):
-        return getattr(obj, 'is_in_shopping_cart', False)
+        return False
 
 
 class RecipeWriteSerializer(ModelSerializer):
-    tags = PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True
-    )
+    tags = PrimaryKeyRelatedField(many=True, read_only=True)
     ingredients = SerializerMethodField()
     author = UserSerializer(read_only=True)
-    image = Base64ImageField()
+    image = UploadableImageField()
 
     class Meta:
         model = Recipe
@@ -108,8 +190,8 @@ class RecipeWriteSerializer(ModelSerializer):
 
     def validate(self, data):
         name = str(self.initial_data.get('name')).strip()
-        tags = self.initial_data.get('tags')
-        ingredients = self.initial_data.get('ingredients')
+        tags = list_value(self.initial_data, 'tags')
+        ingredients = list_value(self.initial_data, 'ingredients')
         cooking_time = self.initial_data.get('cooking_time')
         values_as_list = (tags, ingredients)
 
@@ -122,43 +204,61 @@ class RecipeWriteSerializer(ModelSerializer):
                 )
 
         for tag in tags:
-            value_validate(tag, Tag)
+            value_validate(tag)
+        objects_validate(tags, Tag)
 
-        valid_ingredients = []
+        valid_ingredients = {}
         for ing in ingredients:
             ing_id = ing.get('id')
-            ingredient = ing_id
+            value_validate(ing_id)
 
             amount = ing.get('amount')
             value_validate(amount)
 
-            valid_ingredients.append(
-                {'id': ingredient, 'amount': amount}
+            ingredient = int(ing_id)
+            valid_ingredients[ingredient] = (
+                valid_ingredients.get(ingredient, 0) + int(amount)
             )
+        objects_validate(valid_ingredients, Ingredient)
 
         data['name'] = name.capitalize()
         data['tags'] = tags
-        data['ingredients'] = valid_ingredients
+        data['ingredients'] = [
+            {'id': ingredient, 'amount': amount}
+            for ingredient, amount in valid_ingredients.items()
+        ]
         data['author'] = self.context.get('request').user
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         create_ingredients(ingredients, recipe)
+        schedule_similarity(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, recipe, validated_data):
-        tags = validated_data.get('tags')
+        tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         super().update(recipe, validated_data)
+        reindex = False
         if ingredients:
-            recipe.ingredients.clear()
-            create_ingredients(ingredients, recipe)
+            deltas, reindex = update_ingredients(ingredients, recipe)
+            if deltas:
+                recipe_ingredients_changed(recipe, deltas)
 
         if tags:
-            recipe.tags.clear()
-            recipe.tags.set(tags)
+            current = set(recipe.tags.values_list('id', flat=True))
+            tags = {int(tag) for tag in tags}
+            recipe.tags.remove(*current - tags)
+            recipe.tags.add(*tags - current)
+            reindex = reindex or tags != current
+        # Similarity is a Jaccard over ingredient and tag ids, so amount
+        # and text edits leave it as it is.
+        if reindex:
+            schedule_similarity(recipe)
         return recipe
@@ -1,3 +1,5 @@
+import json
+from collections import Counter
 from string import hexdigits
 
 from rest_framework.serializers import ValidationError
@@ -6,26 +8,109 @@ from recipes.models import IngredientAmount
 
 
 def create_ingredients(ingredients, recipe):
-    for ingredient in ingredients:
-        IngredientAmount.objects.get_or_create(
+    IngredientAmount.objects.bulk_create(
+        IngredientAmount(
             recipe=recipe,
             ingredients_id=ingredient['id'],
             amount=ingredient['amount']
         )
+        for ingredient in ingredients
+    )
 
 
-def value_validate(value, klass=None):
+def current_ingredients(recipe):
+    """Amount rows of the recipe by ingredient id, plus duplicate rows."""
+    current, duplicates = {}, []
+    for row in IngredientAmount.objects.filter(recipe=recipe):
+        if row.ingredients_id in current:
+            duplicates.append(row)
+        else:
+            current[row.ingredients_id] = row
+    return current, duplicates
+
+
+def update_ingredients(ingredients, recipe):
+    """Bring the recipe's amounts in line with ``ingredients``.
+
+    Only rows that actually differ are inserted, updated or deleted.
+    Returns the per-ingredient amount changes, empty when nothing moved,
+    and whether the set of ingredients itself changed.
+    """
+    wanted = {
+        int(ingredient['id']): int(ingredient['amount'])
+        for ingredient in ingredients
+    }
+    current, removed = current_ingredients(recipe)
+    removed += [
+        row for ingredient_id, row in current.items()
+        if ingredient_id not in wanted
+    ]
+    changed = [
+        row for ingredient_id, row in current.items()
+        if ingredient_id in wanted and wanted[ingredient_id] != row.amount
+    ]
+    created = [
+        IngredientAmount(
+            recipe=recipe, ingredients_id=ingredient_id, amount=amount
+        )
+        for ingredient_id, amount in wanted.items()
+        if ingredient_id not in current
+    ]
+
+    deltas = Counter()
+    for row in removed:
+        deltas[row.ingredients_id] -= row.amount
+    for row in changed:
+        deltas[row.ingredients_id] += wanted[row.ingredients_id] - row.amount
+        row.amount = wanted[row.ingredients_id]
+    for row in created:
+        deltas[row.ingredients_id] += row.amount
+
+    IngredientAmount.objects.filter(
+        id__in=[row.id for row in removed]
+    ).delete()
+    IngredientAmount.objects.bulk_update(changed, ('amount',))
+    IngredientAmount.objects.bulk_create(created)
+    deltas = {key: value for key, value in deltas.items() if value}
+    return deltas, wanted.keys() != current.keys()
+
+
+def list_value(data, key):
+    """List field of a JSON body or of a multipart form.
+
+    Form clients send lists either as repeated fields or as one JSON
+    encoded field.
+    """
+    if not hasattr(data, 'getlist'):
+        return data.get(key)
+    values = data.getlist(key)
+    if len(values) == 1:
+        try:
+            decoded = json.loads(values[0])
+        except ValueError:
+            return values
+        if isinstance(decoded, list):
+            return decoded
+    return values
+
+
+def value_validate(value):
     if not str(value).isdecimal():
         raise ValidationError(
             f'{value} must include a number'
         )
-    if klass:
-        obj = klass.objects.filter(id=value)
-        if not obj:
-            raise ValidationError(
-                f'{value} does not exist.'
-            )
-        return obj[0]
+
+
+def objects_validate(values, klass):
+    ids = {int(value) for value in values}
+    found = set(
+        klass.objects.filter(id__in=ids).values_list('id', flat=True)
+    )
+    missing = ', '.join(str(value) for value in sorted(ids - found))
+    if missing:
+        raise ValidationError(
+            f'{missing} does not exist.'
+        )
 
 
 def is_hex_color(value):
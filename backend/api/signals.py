@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from recipes.catalog import purge_surrogate_keys
+from recipes.models import Favorite, Ingredient, Recipe, Tag
+
+from .authentication import token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(instance, **kwargs):
+    token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(instance, raw=False, **kwargs):
+    if not raw:
+        token_cache.discard(*Token.objects.filter(
+            user=instance
+        ).values_list('key', flat=True))
+        purge_surrogate_keys(f'author:{instance.pk}')
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def recipe_changed(instance, **kwargs):
+    purge_surrogate_keys(f'recipe:{instance.pk}', 'recipes:list')
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+def favorites_count_changed(instance, **kwargs):
+    purge_surrogate_keys(f'recipe:{instance.recipe_id}')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(instance, **kwargs):
+    purge_surrogate_keys(f'tag:{instance.pk}', 'tags')
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(**kwargs):
+    purge_surrogate_keys('ingredients')
@@ -0,0 +1,271 @@
+import base64
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import (Ingredient, IngredientAmount, Recipe,
+                            ShoppingCart, ShoppingListItem, Tag)
+from users.models import Subscription, User
+
+
+class RecipeListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f'user{index}', email=f'user{index}@example.com',
+                password='password', first_name='First', last_name='Last',
+            )
+            for index in range(3)
+        ]
+        tags = [
+            Tag.objects.create(
+                name=f'tag{index}', slug=f'tag{index}', color='#FFFFFF'
+            )
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'ingredient{index}', measurement_unit='g'
+            )
+            for index in range(10)
+        ]
+        for index in range(60):
+            recipe = Recipe.objects.create(
+                name=f'recipe{index}', author=cls.users[index % 3],
+                image='recipe_images/recipe.jpg', text='text',
+                cooking_time=5,
+            )
+            recipe.tags.set(tags[:1 + index % 3])
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe,
+                    ingredients=ingredients[(index + offset) % 10],
+                    amount=10,
+                )
+                for offset in range(3)
+            )
+        Subscription.objects.create(user=cls.users[0], author=cls.users[1])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertListQueries(self, queries):
+        for limit in (2, 6, 50):
+            caches['default'].clear()
+            caches['responses'].clear()
+            with self.subTest(limit=limit), self.assertNumQueries(queries):
+                response = self.client.get('/api/recipes/', {'limit': limit})
+                self.assertEqual(len(response.json()['results']), limit)
+
+    def test_anonymous_list_queries_do_not_grow_with_limit(self):
+        self.assertListQueries(4)
+
+    def test_authenticated_list_queries_do_not_grow_with_limit(self):
+        self.client.force_authenticate(self.users[0])
+        self.assertListQueries(7)
+
+    def test_ranked_lists_reject_cursor_paging(self):
+        for name, value in (('search', 'recipe'), ('ordering', 'popular')):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    '/api/recipes/', {name: value, 'cursor': ''}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.json())
+
+    @override_settings(ALLOWED_HOSTS=['first.example', 'second.example'])
+    def test_cached_list_links_follow_the_host(self):
+        caches['responses'].clear()
+        for host in ('first.example', 'second.example'):
+            response = self.client.get(
+                '/api/recipes/', {'limit': 2}, HTTP_HOST=host
+            )
+            self.assertTrue(
+                response.json()['next'].startswith(f'http://{host}/')
+            )
+
+
+def image_data():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class RecipeWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='author', email='author@example.com',
+            password='password', first_name='First', last_name='Last',
+        )
+        cls.tags = [
+            Tag.objects.create(
+                name=f'tag{index}', slug=f'tag{index}', color='#FFFFFF'
+            )
+            for index in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ingredient{index}', measurement_unit='g'
+            )
+            for index in range(50)
+        ]
+
+    def setUp(self):
+        media = TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def payload(self, ingredients):
+        return {
+            'name': 'recipe',
+            'text': 'text',
+            'cooking_time': 5,
+            'image': image_data(),
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 10}
+                for ingredient in ingredients
+            ],
+        }
+
+    def test_create_queries_do_not_grow_with_ingredients(self):
+        for count in (1, 25):
+            with self.subTest(ingredients=count), self.assertNumQueries(15):
+                response = self.client.post(
+                    '/api/recipes/',
+                    self.payload(self.ingredients[:count]),
+                    format='json',
+                )
+            self.assertEqual(response.status_code, 201)
+
+    def test_update_queries_do_not_grow_with_ingredients(self):
+        for count in (1, 25):
+            recipe = self.client.post(
+                '/api/recipes/',
+                self.payload(self.ingredients[:count]),
+                format='json',
+            ).json()
+            with self.subTest(ingredients=count), self.assertNumQueries(19):
+                response = self.client.patch(
+                    f'/api/recipes/{recipe["id"]}/',
+                    self.payload(self.ingredients[25:25 + count]),
+                    format='json',
+                )
+            self.assertEqual(response.status_code, 200)
+
+    def test_only_ingredient_and_tag_set_edits_reindex_similarity(self):
+        payload = self.payload(self.ingredients[:3])
+        recipe = self.client.post(
+            '/api/recipes/', payload, format='json'
+        ).json()
+        url = f'/api/recipes/{recipe["id"]}/'
+        amounts = self.payload(self.ingredients[:3])
+        amounts['ingredients'][0]['amount'] = 20
+        fewer_tags = {**payload, 'tags': payload['tags'][:1]}
+        for change, edit, reindexed in (
+            ('text', {**payload, 'text': 'fixed typo'}, False),
+            ('amount', amounts, False),
+            ('ingredients', self.payload(self.ingredients[1:4]), True),
+            ('tags', fewer_tags, True),
+        ):
+            with self.subTest(change=change), patch(
+                'api.serializers.schedule_similarity'
+            ) as schedule:
+                response = self.client.patch(url, edit, format='json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(schedule.called, reindexed)
+
+
+class ShoppingListExportTests(TestCase):
+    def test_pdf_is_streamed_page_by_page(self):
+        user = User.objects.create_user(
+            username='buyer', email='buyer@example.com', password='password',
+            first_name='Покупатель', last_name='Last',
+        )
+        for index in range(100):
+            ShoppingListItem.objects.create(
+                user=user,
+                ingredient=Ingredient.objects.create(
+                    name=f'мука {index}', measurement_unit='г'
+                ),
+                amount=index + 1,
+            )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get(
+            '/api/recipes/download_shopping_cart/', {'format': 'pdf'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        chunks = [chunk for chunk in response.streaming_content if chunk]
+        self.assertTrue(chunks[0].startswith(b'%PDF-'))
+        self.assertIn(b'/Type /Page ', chunks[1])
+        self.assertGreater(len(chunks), 3)
+        self.assertTrue(chunks[-1].endswith(b'%%EOF\n'))
+
+
+class ShoppingCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='buyer', email='buyer@example.com', password='password',
+            first_name='First', last_name='Last',
+        )
+        cls.flour = Ingredient.objects.create(
+            name='flour', measurement_unit='g'
+        )
+        cls.recipes = []
+        for index in range(2):
+            recipe = Recipe.objects.create(
+                name=f'recipe{index}', author=cls.user,
+                image='recipe_images/recipe.jpg', text='text',
+                cooking_time=5,
+            )
+            IngredientAmount.objects.create(
+                recipe=recipe, ingredients=cls.flour, amount=100
+            )
+            cls.recipes.append(recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def cart_url(self, recipe):
+        return f'/api/recipes/{recipe.id}/shopping_cart/'
+
+    def test_recipes_sharing_an_ingredient_add_up(self):
+        for recipe in self.recipes:
+            self.client.post(self.cart_url(recipe))
+        self.assertEqual(
+            ShoppingListItem.objects.get(user=self.user).amount, 200
+        )
+        self.client.delete(self.cart_url(self.recipes[0]))
+        self.assertEqual(
+            ShoppingListItem.objects.get(user=self.user).amount, 100
+        )
+
+    def test_cart_row_is_rolled_back_with_a_failed_list_update(self):
+        self.client.raise_request_exception = False
+        with patch(
+            'recipes.signals.update_shopping_lists',
+            side_effect=RuntimeError,
+        ):
+            response = self.client.post(self.cart_url(self.recipes[0]))
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(ShoppingCart.objects.exists())
@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 
 from users.views import UserViewSet
 
-from .views import IngredientViewSet, RecipeViewSet, TagViewSet
+from .views import IngredientViewSet, MetricsView, RecipeViewSet, TagViewSet
 
 app_name = 'api'
 
@@ -15,6 +15,7 @@ router.register(r'recipes', RecipeViewSet, 'recipes')
 router.register(r'users', UserViewSet, 'users')
 
 urlpatterns = (
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(router.urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
@@ -1,88 +1,174 @@
-from datetime import datetime as dt
+from hashlib import md5
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Exists, F, OuterRef, Sum, Value
-from django.http.response import HttpResponse
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.http.response import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters import rest_framework as filters
 
+from prometheus_client import CONTENT_TYPE_LATEST
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT)
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
-                            ShoppingCart, Tag)
+from recipes.catalog import catalog_version
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.tag_registry import tag_registry
+from users.models import Subscription
 
-from .filters import IngredientSearchFilter, RecipeFilter
+from .decorators import cache_anonymous, catalog_validators, conditional_get
+from .filters import RecipeFilter
+from .metrics import export_metrics
+from .mixins import ReplicaReadMixin
+from .pagination import FeedPagination, PageOrCursorPagination
 from .permissions import AdminOrReadOnly, AuthorAdminOrReadOnly
+from .renderers import PrometheusRenderer, SHOPPING_LIST_RENDERERS
 from .serializers import (IngredientSerializer, RecipeListSerializer,
                           RecipeWriteSerializer, TagSerializer)
+from .uploadhandlers import LimitedTemporaryFileUploadHandler
 
 User = get_user_model()
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(ReplicaReadMixin, ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AdminOrReadOnly,)
     pagination_class = None
 
+    def surrogate_keys(self, request, data):
+        return ('tags',)
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+    @cache_anonymous(surrogate_keys)
+    @conditional_get(catalog_validators('tags'))
+    def list(self, request, *args, **kwargs):
+        return Response(tag_registry.all())
+
+    @cache_anonymous(surrogate_keys)
+    @conditional_get(catalog_validators('tags'))
+    def retrieve(self, request, pk=None):
+        tag = tag_registry.get(int(pk)) if str(pk).isdecimal() else None
+        if tag is None:
+            raise NotFound
+        return Response(tag)
+
+
+class IngredientViewSet(ReplicaReadMixin, ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AdminOrReadOnly,)
-    filter_backends = (filters.DjangoFilterBackend,)
-    filterset_class = IngredientSearchFilter
-    search_fields = ('^name',)
     pagination_class = None
 
+    @conditional_get(catalog_validators('ingredients'))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @conditional_get(catalog_validators('ingredients'))
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return Response(ingredient_index.all())
+        return Response(
+            ingredient_index.search(name, settings.INGREDIENT_SEARCH_LIMIT)
+        )
+
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, ModelViewSet):
     queryset = Recipe.objects.all().order_by('id')
     permission_classes = (AuthorAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
-    def get_queryset(self):
-        self.paginator.page = self.request.query_params.get('page', 1)
-        self.paginator.page_size = self.request.query_params.get('limit', 6)
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
 
+    def get_queryset(self):
         is_favorited = True if self.request.query_params.get(
             'is_favorited', '0') == '1' else False
         is_in_shopping_cart = True if self.request.query_params.get(
             'is_in_shopping_cart', '0') == '1' else False
 
-        if self.request.user.is_anonymous:
-            qs = Recipe.objects.all().order_by('id')
-            qs = qs.annotate(
-                is_favorited=Value(False),
-                is_in_shopping_cart=Value(False)
+        recipes = Recipe.objects.select_related('author').order_by('id')
+        user = self.request.user
+        if user.is_anonymous:
+            return recipes
+        if is_favorited:
+            recipes = recipes.filter(id__in=Favorite.objects.filter(
+                user=user
+            ).values('recipe_id'))
+        if is_in_shopping_cart:
+            recipes = recipes.filter(id__in=ShoppingCart.objects.filter(
+                user=user
+            ).values('recipe_id'))
+        return recipes
+
+    def recipe_validators(self, request, pk=None):
+        """ETag over every stored value the detail body shows.
+
+        There is no Last-Modified: ``updated_at`` does not move when the
+        author is renamed, so it cannot vouch for the whole body.
+        """
+        if not str(pk).isdecimal():
+            return None, None
+        user = request.user
+        recipes = Recipe.objects.filter(id=pk)
+        fields = (
+            'updated_at', 'favorites_count', 'author__email',
+            'author__username',
+            'author__first_name', 'author__last_name',
+        )
+        if not user.is_anonymous:
+            recipes = recipes.annotate(
+                is_favorited=Exists(Favorite.objects.filter(
+                    user=user, recipe=OuterRef('id')
+                )),
+                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef('id')
+                )),
+                is_subscribed=Exists(Subscription.objects.filter(
+                    user=user, author=OuterRef('author_id')
+                )),
             )
+            fields += ('is_favorited', 'is_in_shopping_cart', 'is_subscribed')
+        state = recipes.values_list(*fields).first()
+        if state is None:
+            return None, None
+        etag = md5(repr((
+            pk, user.id, state,
+            catalog_version('tags'), catalog_version('ingredients'),
+        )).encode()).hexdigest()
+        return etag, None
+
+    def surrogate_keys(self, request, data):
+        keys = {'ingredients'}
+        if 'results' in data:
+            keys.add('recipes:list')
+            recipes = data['results']
         else:
-            favorite_qs = Favorite.objects.filter(
-                user=self.request.user, recipe=OuterRef('id')
-            )
-            cart_qs = ShoppingCart.objects.filter(
-                user=self.request.user, recipe=OuterRef('id')
-            )
-            qs = Recipe.objects.all().order_by('id').annotate(
-                is_favorited=Exists(favorite_qs),
-                is_in_shopping_cart=Exists(cart_qs)
-            )
-            if is_favorited:
-                qs = qs.filter(
-                    id__in=(favorite_qs.values('recipe_id'))
-                )
-            if is_in_shopping_cart:
-                qs = qs.filter(
-                    id__in=(cart_qs.values('recipe_id'))
-                )
-        return qs
+            recipes = (data,)
+        for recipe in recipes:
+            keys.add(f'recipe:{recipe["id"]}')
+            keys.add(f'author:{recipe["author"]["id"]}')
+            keys.update(f'tag:{tag["id"]}' for tag in recipe['tags'])
+        return keys
+
+    @cache_anonymous(surrogate_keys)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_anonymous(surrogate_keys)
+    @conditional_get(recipe_validators, vary=('Authorization',))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.request.method in ('GET'):
@@ -136,6 +222,7 @@ class RecipeViewSet(ModelViewSet):
         url_path='shopping_cart',
         detail=True,
         permission_classes=[IsAuthenticated])
+    @transaction.atomic
     def shopping_cart(self, request, pk):
         recipe = get_object_or_404(Recipe, id=pk)
         cart = ShoppingCart.objects.create(
@@ -151,6 +238,7 @@ class RecipeViewSet(ModelViewSet):
         return Response(data, status=HTTP_201_CREATED)
 
     @shopping_cart.mapping.delete
+    @transaction.atomic
     def delete_shopping_cart(self, request, pk):
         self.delete_method(
             request=request, pk=pk, model=ShoppingCart)
@@ -160,38 +248,75 @@ class RecipeViewSet(ModelViewSet):
         methods=['GET'],
         url_path='download_shopping_cart',
         detail=False,
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=SHOPPING_LIST_RENDERERS,
     )
     def download_shopping_cart(self, request):
         user = self.request.user
-        if user.is_anonymous:
-            return Response(status=403)
-
-        cart_qs = ShoppingCart.objects.filter(
-            user=self.request.user, recipe=OuterRef('id')
-        )
-        qs = Recipe.objects.all().filter(
-            id__in=(cart_qs.values('recipe_id'))
-        )
-        ingredients = IngredientAmount.objects.filter(
-            recipe__in=(qs.values('id'))
+        ingredients = Ingredient.objects.filter(
+            shopping_list_items__user=user
         ).values(
-            ingredient=F('ingredients__name'),
-            measure=F('ingredients__measurement_unit')
-        ).annotate(amount=Sum('amount'))
-
-        filename = f'{user.first_name}_shopping_list.txt'
-        shopping_list = (
-            f'Shopping_list for:\n\n{user.first_name}\n\n'
-            f'{dt.now().strftime("%d/%m/%Y %H:%M")}\n\n'
+            ingredient=F('name'),
+            measure=F('measurement_unit'),
+            amount=F('shopping_list_items__amount'),
         )
-        for ing in ingredients:
-            shopping_list += (
-                f'{ing["ingredient"]}: {ing["amount"]} {ing["measure"]}\n'
-            )
-        shopping_list += '\n\nCounted in Foodgram'
-        response = HttpResponse(
-            shopping_list, content_type='text.txt; charset=utf-8'
+
+        renderer = request.accepted_renderer
+        filename = f'{user.first_name}_shopping_list.{renderer.format}'
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(user, ingredients.iterator()),
+            content_type=content_type,
         )
         response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+    @action(
+        methods=['GET'],
+        url_path='feed',
+        detail=False,
+        permission_classes=(IsAuthenticated,),
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        recipes = self.get_queryset().filter(feed_entries__user=request.user)
+        page = self.paginate_queryset(recipes)
+        serializer = RecipeListSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(methods=['GET'], url_path='similar', detail=True)
+    def similar(self, request, pk=None):
+        recipes = Recipe.objects.select_related('author').filter(
+            similar_to__recipe=self.get_object()
+        ).order_by('-similar_to__score', '-id')
+        serializer = RecipeListSerializer(
+            recipes, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @action(
+        methods=['GET'],
+        url_path='shopping_cart/summary',
+        detail=False,
+        permission_classes=(IsAuthenticated,)
+    )
+    def shopping_cart_summary(self, request):
+        ingredients = Ingredient.objects.filter(
+            shopping_list_items__user=request.user
+        ).values(
+            'id', 'name', 'measurement_unit',
+            amount=F('shopping_list_items__amount')
+        )
+        return Response(ingredients)
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(export_metrics(), content_type=CONTENT_TYPE_LATEST)
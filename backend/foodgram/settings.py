@@ -38,6 +38,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +80,49 @@ DATABASES = {
     }
 }
 
+# Optional read replica; set DB_REPLICA_NAME and/or DB_REPLICA_HOST.
+if os.getenv('DB_REPLICA_NAME') or os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv(
+            'DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': os.getenv(
+            'DB_REPLICA_HOST', default=DATABASES['default']['HOST']),
+        'PORT': os.getenv(
+            'DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=10))
+
+# Every process serving the API (gunicorn workers, manage.py commands)
+# must share both stores: they hold replica pins, shared token entries,
+# catalog versions and surrogate keys. The LocMem defaults only suit a
+# single-process runserver.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='foodgram'),
+    },
+    # Anonymous API responses, recipe fragments, the surrogate key
+    # versions both are validated against and the catalog versions.
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv(
+            'RESPONSE_CACHE_LOCATION', default='foodgram-responses'),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TTL', default=300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('RESPONSE_CACHE_MAX_ENTRIES', default=10000)),
+        },
+    },
+}
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -102,7 +146,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':
-    ['rest_framework.authentication.TokenAuthentication', ],
+    ['api.authentication.CachedTokenAuthentication', ],
 
     'DEFAULT_PERMISSION_CLASSES':
     ['rest_framework.permissions.IsAuthenticatedOrReadOnly', ],
@@ -111,6 +155,13 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 6
 }
 
+INGREDIENT_SEARCH_LIMIT = 50
+
+# Token -> user snapshots kept per worker (and in CACHES when shared).
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 30
+TOKEN_CACHE_SHARED = os.getenv('TOKEN_CACHE_SHARED', default='') == 'true'
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
@@ -140,4 +191,49 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+RECIPE_IMAGE_MAX_SIZE = 10 * 2 ** 20
+RECIPE_IMAGE_MAX_DIMENSION = 8000
+
+IMAGE_RENDITIONS = {
+    'thumbnail': 240,
+    'card': 480,
+    'full': 1280,
+}
+IMAGE_RENDITION_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 85, 'optimize': True,
+             'progressive': True},
+}
+# Renditions, feed fan-out and similarity indexing run on in-process
+# worker threads after commit. SQLite takes one writer at a time, so on
+# it they run inline in the committing request unless turned on.
+BACKGROUND_WORKERS = os.getenv(
+    'BACKGROUND_WORKERS',
+    default='false' if 'sqlite' in DATABASES['default']['ENGINE'] else 'true',
+) == 'true'
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', default=2))
+
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+
+FEED_WORKERS = int(os.getenv('FEED_WORKERS', default=1))
+FEED_BATCH_SIZE = 1000
+FEED_BACKFILL_LIMIT = 500
+
+# Serialized recipe bodies: served fresh for RECIPE_FRAGMENT_TTL, then
+# stale while one request refills them, evicted after the stale TTL.
+RECIPE_FRAGMENT_TTL = 300
+RECIPE_FRAGMENT_STALE_TTL = 3600
+RECIPE_FRAGMENT_FILL_WAIT = 0.2
+
+# Trending activity halves in weight every half-life; a lone favourite
+# drops out of the ranking once it is TRENDING_WINDOW_DAYS old.
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WINDOW_DAYS = 7
+TRENDING_FAVORITE_WEIGHT = 1.0
+TRENDING_CART_WEIGHT = 0.5
+
+# Neighbours kept per recipe and MinHash candidates scored to find them.
+SIMILAR_RECIPES = 10
+SIMILARITY_CANDIDATES = 200
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
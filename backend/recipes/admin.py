@@ -2,7 +2,7 @@ from django.contrib.admin import (ModelAdmin, TabularInline,
                                   register, site)
 
 from .models import (Favorite, Ingredient, IngredientAmount,
-                     Recipe, ShoppingCart, Tag)
+                     Recipe, ShoppingCart, ShoppingListItem, Tag)
 
 site.site_header = 'Foodgram administration'
 
@@ -45,7 +45,9 @@ class RecipeAdmin(ModelAdmin):
         'name',
         'author',
         'count_favorites',
+        'carts_count',
     )
+    list_select_related = ('author',)
     list_filter = (
         'author',
         'name',
@@ -55,7 +57,7 @@ class RecipeAdmin(ModelAdmin):
     empty_value_display = '-empty-'
 
     def count_favorites(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 @register(Favorite)
@@ -74,3 +76,13 @@ class ShoppingCartAdmin(ModelAdmin):
         'user',
         'recipe',
     )
+
+
+@register(ShoppingListItem)
+class ShoppingListItemAdmin(ModelAdmin):
+    list_display = (
+        'pk',
+        'user',
+        'ingredient',
+        'amount',
+    )
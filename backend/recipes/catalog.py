@@ -0,0 +1,85 @@
+from threading import Lock
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'catalog_version:{}'
+SURROGATE_VERSION_KEY = 'surrogate_version:{}'
+PURGE_EPOCH_KEY = 'surrogate_epoch'
+
+
+def catalog_version(name):
+    """Opaque token that changes whenever the named catalog is edited.
+
+    Tokens live in the shared ``responses`` store so that a bump from
+    one process (an admin edit, ``import_ingredients``) reaches the
+    per-process snapshots of all the others.
+    """
+    return caches['responses'].get_or_set(
+        CATALOG_VERSION_KEY.format(name), uuid4().hex, timeout=None
+    )
+
+
+def bump_catalog_version(name):
+    caches['responses'].set(
+        CATALOG_VERSION_KEY.format(name), uuid4().hex, timeout=None
+    )
+
+
+def surrogate_versions(keys):
+    """Current version token of each surrogate key of cached responses.
+
+    Tokens live next to the responses in the ``responses`` cache, so a
+    purge is visible to every worker that shares the response store.
+    """
+    store = caches['responses']
+    names = {SURROGATE_VERSION_KEY.format(key): key for key in keys}
+    versions = store.get_many(names)
+    missing = [name for name in names if name not in versions]
+    for name in missing:
+        # add() keeps the first token when several requests race here.
+        store.add(name, uuid4().hex, timeout=None)
+    if missing:
+        versions.update(store.get_many(missing))
+    return {key: versions.get(name) for name, key in names.items()}
+
+
+def purge_epoch():
+    """Opaque token that changes whenever any surrogate key is purged."""
+    return caches['responses'].get_or_set(
+        PURGE_EPOCH_KEY, uuid4().hex, timeout=None
+    )
+
+
+def purge_surrogate_keys(*keys):
+    """Invalidate cached responses tagged with any of ``keys``."""
+    names = [SURROGATE_VERSION_KEY.format(key) for key in keys]
+
+    def purge():
+        store = caches['responses']
+        store.delete_many(names)
+        store.set(PURGE_EPOCH_KEY, uuid4().hex, timeout=None)
+
+    transaction.on_commit(purge)
+
+
+class CatalogSnapshot:
+    """Per-process copy of a catalog, reloaded when its version moves."""
+    catalog = None
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+
+    def refresh(self):
+        version = catalog_version(self.catalog)
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self.load()
+                self._version = version
+
+    def load(self):
+        raise NotImplementedError
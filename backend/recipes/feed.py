@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+
+from users.models import Subscription
+
+from .models import FeedEntry, Recipe
+from .workers import run_after_commit
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.FEED_WORKERS, thread_name_prefix='feed'
+)
+
+
+def insert_entries(pairs):
+    """Bulk insert ``(user_id, recipe_id)`` pairs, skipping existing ones."""
+    pairs = iter(pairs)
+    while True:
+        batch = [
+            FeedEntry(user_id=user_id, recipe_id=recipe_id)
+            for user_id, recipe_id in islice(pairs, settings.FEED_BATCH_SIZE)
+        ]
+        if not batch:
+            return
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(recipe_id, author_id):
+    """Add a new recipe to the feed of every subscriber of its author."""
+    subscribers = Subscription.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    insert_entries(
+        (user_id, recipe_id)
+        for user_id in subscribers.iterator(settings.FEED_BATCH_SIZE)
+    )
+
+
+def backfill(user_id, author_id):
+    """Put the author's newest recipes into a new subscriber's feed."""
+    recipes = Recipe.objects.filter(
+        author_id=author_id
+    ).order_by('-id').values_list('id', flat=True)
+    insert_entries(
+        (user_id, recipe_id)
+        for recipe_id in recipes[:settings.FEED_BACKFILL_LIMIT]
+    )
+
+
+def schedule_fan_out(recipe):
+    """Queue the fan-out once the recipe is committed."""
+    run_after_commit(executor, fan_out, recipe.id, recipe.author_id)
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .catalog import purge_surrogate_keys
+from .models import Recipe
+from .workers import run_after_commit
+
+RENDITIONS_DIR = 'recipe_images/renditions'
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS, thread_name_prefix='renditions'
+)
+
+
+def render(image, size, options):
+    copy = image.copy()
+    copy.thumbnail((size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    copy.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def build_renditions(recipe_id, source):
+    """Write every rendition of ``source`` and record them on the recipe.
+
+    Re-encoding from decoded pixels drops EXIF and other metadata; the
+    EXIF orientation is applied first so nothing ends up rotated.
+    """
+    with default_storage.open(source) as file:
+        image = ImageOps.exif_transpose(Image.open(file)).convert('RGB')
+    stem = PurePosixPath(source).stem
+    files = {}
+    for name, size in settings.IMAGE_RENDITIONS.items():
+        files[name] = {}
+        for extension, options in settings.IMAGE_RENDITION_FORMATS.items():
+            path = default_storage.save(
+                f'{RENDITIONS_DIR}/{stem}_{name}.{extension}',
+                ContentFile(render(image, size, options)),
+            )
+            files[name][extension] = path
+
+    updated = Recipe.objects.filter(id=recipe_id, image=source).update(
+        renditions={'source': source, 'files': files},
+        updated_at=timezone.now(),
+    )
+    if updated:
+        purge_surrogate_keys(f'recipe:{recipe_id}')
+    else:
+        delete_renditions({'files': files})
+
+
+def delete_renditions(renditions):
+    for formats in renditions.get('files', {}).values():
+        for path in formats.values():
+            default_storage.delete(path)
+
+
+def refresh_renditions(recipe_id, source, stale):
+    delete_renditions(stale)
+    build_renditions(recipe_id, source)
+
+
+def schedule_renditions(recipe):
+    """Queue rendition building once the current transaction commits."""
+    run_after_commit(
+        executor, refresh_renditions,
+        recipe.id, recipe.image.name, recipe.renditions,
+    )
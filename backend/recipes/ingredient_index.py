@@ -0,0 +1,62 @@
+from bisect import bisect_left
+from itertools import islice
+
+from .catalog import CatalogSnapshot
+from .models import Ingredient
+
+
+class IngredientIndex(CatalogSnapshot):
+    """Per-process ingredient catalog sorted by case-folded name.
+
+    Prefix lookups are answered by binary search over the sorted keys,
+    so autocomplete never reaches the database while the catalog
+    version is unchanged.
+    """
+    catalog = 'ingredients'
+
+    def __init__(self):
+        super().__init__()
+        self._keys = []
+        self._items = []
+
+    def load(self):
+        rows = sorted(
+            (name.casefold(), pk, name, measurement_unit)
+            for pk, name, measurement_unit
+            in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        )
+        self._keys = [row[0] for row in rows]
+        self._items = [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for _, pk, name, unit in rows
+        ]
+
+    def all(self):
+        self.refresh()
+        return self._items
+
+    def search(self, query, limit):
+        self.refresh()
+        keys, items = self._keys, self._items
+        query = query.strip().casefold()
+        found = []
+        position = bisect_left(keys, query)
+        while (
+            position < len(keys)
+            and len(found) < limit
+            and keys[position].startswith(query)
+        ):
+            found.append(items[position])
+            position += 1
+        if len(found) < limit:
+            contains = (
+                item for key, item in zip(keys, items)
+                if query in key and not key.startswith(query)
+            )
+            found.extend(islice(contains, limit - len(found)))
+        return found
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_renditions, delete_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Build missing or outdated recipe picture renditions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Rebuild renditions for every recipe.',
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        recipes = Recipe.objects.exclude(image='').only('image', 'renditions')
+        for recipe in recipes.iterator():
+            source = recipe.image.name
+            if (
+                not options['all']
+                and recipe.renditions.get('source') == source
+            ):
+                continue
+            delete_renditions(recipe.renditions)
+            build_renditions(recipe.id, source)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Built renditions for {built} recipes.'
+        ))
@@ -0,0 +1,136 @@
+import csv
+import json
+from json.decoder import WHITESPACE
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.catalog import bump_catalog_version
+from recipes.models import Ingredient
+
+CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+class JSONArrayReader:
+    """Objects of a top-level JSON array, decoded one at a time.
+
+    The file is read in chunks and only the undecoded rest of the buffer
+    is kept, so memory does not grow with the size of the catalog.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.position = '', 0
+
+    def read_more(self):
+        chunk = self.file.read(CHUNK_SIZE)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return bool(chunk)
+
+    def next_symbol(self):
+        while True:
+            self.position = WHITESPACE.match(
+                self.buffer, self.position
+            ).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return ''
+
+    def expect(self, symbols):
+        symbol = self.next_symbol()
+        if not symbol or symbol not in symbols:
+            raise CommandError(f'Invalid JSON: expected one of "{symbols}".')
+        self.position += 1
+        return symbol
+
+    def decode(self):
+        self.next_symbol()
+        while True:
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return item
+            except json.JSONDecodeError as error:
+                if not self.read_more():
+                    raise CommandError(f'Invalid JSON: {error}')
+
+    def __iter__(self):
+        self.expect('[')
+        if self.next_symbol() == ']':
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',]') == ']':
+                return
+
+
+def read_json(file):
+    for item in JSONArrayReader(file):
+        yield item.get('name', ''), item.get('measurement_unit', '')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Import the ingredient catalog from a CSV file or a JSON array.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument(
+            '--format', choices=tuple(READERS),
+            help='File format, guessed from the extension by default.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unsupported file format: {path}')
+        try:
+            file = path.open(encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+
+        batch_size = options['batch_size']
+        with file, transaction.atomic():
+            known = set(
+                Ingredient.objects.values_list('name', 'measurement_unit')
+            )
+            before = len(known)
+            total, batch = 0, []
+            for name, measurement_unit in READERS[file_format](file):
+                total += 1
+                key = (name.strip(), measurement_unit.strip())
+                if not all(key) or key in known:
+                    continue
+                known.add(key)
+                batch.append(Ingredient(name=key[0], measurement_unit=key[1]))
+                if len(batch) >= batch_size:
+                    Ingredient.objects.bulk_create(
+                        batch, ignore_conflicts=True
+                    )
+                    batch = []
+            Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+            inserted = Ingredient.objects.count() - before
+
+        if inserted:
+            bump_catalog_version('ingredients')
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted: {inserted}, skipped: {total - inserted}.'
+        ))
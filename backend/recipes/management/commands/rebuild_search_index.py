@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes.search import index_recipes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of all recipes.'
+
+    def handle(self, *args, **options):
+        index_recipes()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recipes.services import rebuild_shopping_lists
+
+
+class Command(BaseCommand):
+    help = 'Rebuild shopping list totals from carts and report any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only check the given user id (can be repeated).',
+        )
+
+    def handle(self, *args, **options):
+        drift = rebuild_shopping_lists(options['user_ids'])
+        for (user_id, ingredient_id), (actual, expected) in sorted(
+            drift.items()
+        ):
+            self.stdout.write(
+                f'user {user_id}, ingredient {ingredient_id}: '
+                f'{actual} -> {expected}'
+            )
+        if drift:
+            self.stdout.write(self.style.WARNING(
+                f'Fixed {len(drift)} drifted shopping list rows.'
+            ))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS('Shopping lists are consistent.')
+            )
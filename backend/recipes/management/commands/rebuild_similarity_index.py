@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import rebuild_similarity_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild MinHash bands and similar recipe lists of all recipes.'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_similarity_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Similarity index rebuilt for {indexed} recipes.'
+        ))
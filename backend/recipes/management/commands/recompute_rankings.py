@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.rankings import recompute_rankings
+
+
+class Command(BaseCommand):
+    help = 'Fold favourite and cart activity since the last run into rankings.'
+
+    def handle(self, *args, **options):
+        rescored = recompute_rankings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Trending scores updated for {rescored} recipes.'
+        ))
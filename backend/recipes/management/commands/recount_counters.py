@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.services import recount_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount favorite, cart, recipe and subscriber counters.'
+
+    def handle(self, *args, **options):
+        for counter, drifted in recount_counters().items():
+            self.stdout.write(f'{counter}: {drifted} rows fixed')
+        self.stdout.write(self.style.SUCCESS('Counters recounted.'))
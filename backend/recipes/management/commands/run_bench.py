@@ -0,0 +1,174 @@
+import json
+from pathlib import Path
+from random import Random
+from statistics import median_low
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, ShoppingCart, Tag
+
+User = get_user_model()
+
+
+def recipe_list(bench):
+    return bench.client.get('/api/recipes/')
+
+
+def filtered_list(bench):
+    return bench.client.get(
+        '/api/recipes/', {'tags': bench.tags, 'is_favorited': 1}
+    )
+
+
+def recipe_detail(bench):
+    return bench.client.get(f'/api/recipes/{bench.next_recipe()}/')
+
+
+def similar_recipes(bench):
+    return bench.client.get(f'/api/recipes/{bench.next_recipe()}/similar/')
+
+
+def favorite_toggle(bench):
+    url = f'/api/recipes/{bench.next_recipe()}/favorite/'
+    response = bench.client.post(url)
+    bench.client.delete(url)
+    return response
+
+
+def cart_download(bench):
+    response = bench.client.get('/api/recipes/download_shopping_cart/')
+    b''.join(response.streaming_content)
+    return response
+
+
+def subscriptions(bench):
+    return bench.client.get(
+        '/api/users/subscriptions/', {'recipes_limit': 3}
+    )
+
+
+def trending_list(bench):
+    return bench.client.get('/api/recipes/', {'ordering': 'trending'})
+
+
+def feed(bench):
+    return bench.client.get('/api/recipes/feed/')
+
+
+def ingredient_autocomplete(bench):
+    return bench.client.get(
+        '/api/ingredients/', {'name': bench.next_prefix()}
+    )
+
+
+SCENARIOS = {
+    'list': recipe_list,
+    'filtered_list': filtered_list,
+    'trending_list': trending_list,
+    'detail': recipe_detail,
+    'similar': similar_recipes,
+    'favorite_toggle': favorite_toggle,
+    'cart_download': cart_download,
+    'subscriptions': subscriptions,
+    'feed': feed,
+    'ingredient_autocomplete': ingredient_autocomplete,
+}
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Bench:
+    """Fixtures the scenarios draw from, deterministic by seed."""
+
+    def __init__(self, user, seed):
+        self.random = Random(seed)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        self.recipes = list(Recipe.objects.exclude(
+            favorites__user=user
+        ).values_list('id', flat=True)[:1000])
+        self.prefixes = [
+            name[:2] for name in
+            Ingredient.objects.values_list('name', flat=True)[:1000]
+        ]
+        if not self.recipes or not self.prefixes:
+            raise CommandError('Run seed_bench first.')
+
+    def next_recipe(self):
+        return self.random.choice(self.recipes)
+
+    def next_prefix(self):
+        return self.random.choice(self.prefixes)
+
+
+class Command(BaseCommand):
+    help = 'Time the main API scenarios and write the results as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--scenario', action='append', choices=tuple(SCENARIOS),
+            dest='scenarios', help='Only run the given scenario.',
+        )
+        parser.add_argument(
+            '--output', type=Path,
+            help='Write the JSON report here instead of stdout.',
+        )
+
+    def handle(self, *args, **options):
+        user = ShoppingCart.objects.values_list('user', flat=True).first()
+        if user is None:
+            raise CommandError('Run seed_bench first.')
+        bench = Bench(User.objects.get(id=user), options['seed'])
+
+        report = {
+            'iterations': options['iterations'],
+            'recipes': Recipe.objects.count(),
+            'users': User.objects.count(),
+            'scenarios': {},
+        }
+        for name in options['scenarios'] or SCENARIOS:
+            report['scenarios'][name] = self.run(
+                SCENARIOS[name], bench,
+                options['iterations'], options['warmup'],
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            options['output'].write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run(self, scenario, bench, iterations, warmup):
+        for _ in range(warmup):
+            scenario(bench)
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = perf_counter()
+                response = scenario(bench)
+                timings.append((perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{scenario.__name__}: HTTP {response.status_code}'
+                )
+            queries.append(len(captured))
+        return {
+            'p50_ms': round(median_low(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': median_low(queries),
+            'max_queries': max(queries),
+        }
@@ -0,0 +1,212 @@
+from random import Random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.catalog import bump_catalog_version
+from recipes.feed import backfill
+from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
+                            ShoppingCart, Tag)
+from recipes.search import index_recipes
+from recipes.services import rebuild_shopping_lists, recount_counters
+from recipes.similarity import rebuild_similarity_index
+from users.models import Subscription
+
+User = get_user_model()
+
+PREFIX = 'bench_'
+TAGS = (
+    ('Breakfast', 'breakfast', '#E26C2D'),
+    ('Lunch', 'lunch', '#49B64E'),
+    ('Dinner', 'dinner', '#8775D2'),
+    ('Dessert', 'dessert', '#D2758C'),
+    ('Vegan', 'vegan', '#3B9C5A'),
+)
+MEASUREMENT_UNITS = ('г', 'мл', 'шт.', 'ст. л.', 'ч. л.', 'по вкусу')
+WORDS = (
+    'soup', 'salad', 'pie', 'stew', 'pancakes', 'pasta', 'risotto',
+    'curry', 'cake', 'omelette', 'porridge', 'borscht', 'dumplings',
+    'chicken', 'beef', 'mushroom', 'tomato', 'cheese', 'apple', 'lemon',
+)
+
+
+def zipf_weights(count, exponent=1.1):
+    """A few items are very popular, most are rare."""
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+class Command(BaseCommand):
+    help = 'Generate a reproducible synthetic dataset for benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients', type=int, default=2000,
+            help='Synthetic ingredients to add when the catalog is smaller.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete the previously generated users and their data.',
+        )
+
+    def handle(self, *args, **options):
+        random = Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            if options['clear']:
+                User.objects.filter(username__startswith=PREFIX).delete()
+            tags = self.seed_tags()
+            ingredients = self.seed_ingredients(options['ingredients'])
+            users = self.seed_users(options['users'])
+            recipes = self.seed_recipes(
+                random, options['recipes'], users, tags, ingredients
+            )
+            self.seed_relations(random, users, recipes)
+            recount_counters()
+            rebuild_shopping_lists(users)
+            for user, author in Subscription.objects.filter(
+                user__in=users
+            ).values_list('user', 'author'):
+                backfill(user, author)
+        index_recipes()
+        rebuild_similarity_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(users)} users and {len(recipes)} recipes.'
+        ))
+
+    def seed_tags(self):
+        for name, slug, color in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug, defaults={'name': name, 'color': color}
+            )
+        bump_catalog_version('tags')
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def seed_ingredients(self, count):
+        missing = count - Ingredient.objects.count()
+        if missing > 0:
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(
+                        name=f'{PREFIX}ingredient_{number}',
+                        measurement_unit=MEASUREMENT_UNITS[
+                            number % len(MEASUREMENT_UNITS)
+                        ],
+                    )
+                    for number in range(missing)
+                ),
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            bump_catalog_version('ingredients')
+        return list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def seed_users(self, count):
+        password = make_password(None)
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{PREFIX}{number}',
+                    email=f'{PREFIX}{number}@example.com',
+                    first_name='Bench',
+                    last_name=f'User {number}',
+                    password=password,
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        return list(User.objects.filter(
+            username__startswith=PREFIX
+        ).order_by('id').values_list('id', flat=True))
+
+    def seed_recipes(self, random, count, users, tags, ingredients):
+        authors = random.choices(users, zipf_weights(len(users)), k=count)
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=author,
+                    name=' '.join(random.sample(WORDS, 3)).capitalize(),
+                    text=' '.join(random.choices(WORDS, k=40)),
+                    image='recipe_images/bench.png',
+                    cooking_time=int(random.triangular(5, 240, 30)),
+                )
+                for author in authors
+            ),
+            batch_size=self.batch_size,
+        )
+        recipes = list(Recipe.objects.filter(
+            author_id__in=users
+        ).order_by('id').values_list('id', flat=True))
+
+        tag_weights = zipf_weights(len(tags), 0.5)
+        ingredient_weights = zipf_weights(len(ingredients))
+        recipe_tags, amounts = [], []
+        for recipe in recipes:
+            chosen_tags = set(random.choices(
+                tags, tag_weights, k=random.randint(1, 3)
+            ))
+            recipe_tags.extend(
+                Recipe.tags.through(recipe_id=recipe, tag_id=tag)
+                for tag in chosen_tags
+            )
+            chosen_ingredients = set(random.choices(
+                ingredients, ingredient_weights,
+                k=int(random.triangular(3, 15, 7)),
+            ))
+            amounts.extend(
+                IngredientAmount(
+                    recipe_id=recipe,
+                    ingredients_id=ingredient,
+                    amount=random.choice((1, 2, 5, 10, 50, 100, 200, 500)),
+                )
+                for ingredient in chosen_ingredients
+            )
+        Recipe.tags.through.objects.bulk_create(
+            recipe_tags, batch_size=self.batch_size
+        )
+        IngredientAmount.objects.bulk_create(
+            amounts, batch_size=self.batch_size
+        )
+        return recipes
+
+    def seed_relations(self, random, users, recipes):
+        recipe_weights = zipf_weights(len(recipes))
+        author_weights = zipf_weights(len(users))
+        favorites, carts, subscriptions = [], [], []
+        for user in users:
+            favorites.extend(
+                Favorite(user_id=user, recipe_id=recipe)
+                for recipe in set(random.choices(
+                    recipes, recipe_weights, k=random.randint(0, 30)
+                ))
+            )
+            carts.extend(
+                ShoppingCart(user_id=user, recipe_id=recipe)
+                for recipe in set(random.choices(
+                    recipes, recipe_weights, k=random.randint(0, 8)
+                ))
+            )
+            subscriptions.extend(
+                Subscription(user_id=user, author_id=author)
+                for author in set(random.choices(
+                    users, author_weights, k=random.randint(0, 20)
+                ))
+                if author != user
+            )
+        for model, rows in (
+            (Favorite, favorites),
+            (ShoppingCart, carts),
+            (Subscription, subscriptions),
+        ):
+            model.objects.bulk_create(
+                rows, batch_size=self.batch_size, ignore_conflicts=True
+            )
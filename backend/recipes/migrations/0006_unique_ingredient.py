@@ -0,0 +1,48 @@
+# Generated by Django 3.2.15 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    ShoppingListItem = apps.get_model('recipes', 'ShoppingListItem')
+    kept = {}
+    for ingredient in Ingredient.objects.order_by('id'):
+        key = (ingredient.name, ingredient.measurement_unit)
+        if key not in kept:
+            kept[key] = ingredient.id
+            continue
+        target = kept[key]
+        IngredientAmount.objects.filter(
+            ingredients_id=ingredient.id
+        ).update(ingredients_id=target)
+        for item in ShoppingListItem.objects.filter(
+            ingredient_id=ingredient.id
+        ):
+            updated = ShoppingListItem.objects.filter(
+                user_id=item.user_id, ingredient_id=target
+            ).update(amount=models.F('amount') + item.amount)
+            if updated:
+                item.delete()
+            else:
+                item.ingredient_id = target
+                item.save(update_fields=('ingredient',))
+        ingredient.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient_name_measurement_unit'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.15 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+
+def merge_duplicate_amounts(apps, schema_editor):
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    kept = {}
+    for row in IngredientAmount.objects.order_by('id'):
+        key = (row.recipe_id, row.ingredients_id)
+        if key not in kept:
+            kept[key] = row.id
+            continue
+        IngredientAmount.objects.filter(id=kept[key]).update(
+            amount=models.F('amount') + row.amount
+        )
+        row.delete()
+
+
+def create_pattern_indexes(apps, schema_editor):
+    # istartswith compiles to UPPER(name::text) LIKE UPPER(...) and
+    # startswith to name LIKE ...; outside the C locale only the
+    # pattern_ops operator classes let PostgreSQL use a btree for them.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX recipes_ingredient_upper_name_like '
+            'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX recipes_ingredient_name_like '
+            'ON recipes_ingredient (name varchar_pattern_ops)'
+        )
+
+
+def drop_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS recipes_ingredient_upper_name_like'
+        )
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS recipes_ingredient_name_like'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date', '-id'], name='recipe_pub_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            merge_duplicate_amounts, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredientamount',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredients'), name='unique_ingredientamount_recipe_ingredients'),
+        ),
+        migrations.RunPython(create_pattern_indexes, drop_pattern_indexes),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.15 on 2026-10-18 02:47
+
+import datetime
+
+from django.db import migrations, models
+
+# Existing rows have no known add time; keep them out of the trending
+# window instead of counting all past activity as new.
+UNKNOWN = datetime.datetime(1970, 1, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField(db_index=True, verbose_name='Activity counted up to')),
+                ('recipes', models.PositiveIntegerField(default=0, verbose_name='Recipes rescored')),
+            ],
+            options={
+                'verbose_name': 'Ranking run',
+                'verbose_name_plural': 'Ranking runs',
+                'ordering': ('-computed_at',),
+            },
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='added_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=UNKNOWN, verbose_name='Added at'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Trending score'),
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='added_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=UNKNOWN, verbose_name='Added at'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-trending_score', '-id'], name='recipe_trending_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db.models import (CASCADE, CharField, DateTimeField, ForeignKey,
-                              ImageField, ManyToManyField, Model,
+from django.db.models import (BigIntegerField, CASCADE, CharField,
+                              DateTimeField, FloatField, ForeignKey,
+                              ImageField, Index, JSONField, ManyToManyField,
+                              Model, PositiveIntegerField,
                               PositiveSmallIntegerField, TextField,
                               UniqueConstraint)
 
@@ -50,6 +53,15 @@ class Ingredient(Model):
         verbose_name = 'Ingredient'
         verbose_name_plural = 'Ingredients'
         ordering = ('name', )
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'name',
+                    'measurement_unit',
+                ),
+                name='unique_ingredient_name_measurement_unit',
+            )
+        ]
 
     def __str__(self) -> str:
         return f'{self.name} {self.measurement_unit}'
@@ -81,6 +93,11 @@ class Recipe(Model):
         verbose_name='Recipe picture',
         upload_to='recipe_images/',
     )
+    renditions = JSONField(
+        verbose_name='Picture renditions',
+        default=dict,
+        editable=False,
+    )
     text = TextField(
         verbose_name='Recipe description',
         max_length=5000,
@@ -107,11 +124,53 @@ class Recipe(Model):
         verbose_name='Publication date',
         auto_now_add=True,
     )
+    updated_at = DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+    )
+    favorites_count = PositiveIntegerField(
+        verbose_name='Times favorited',
+        default=0,
+        editable=False,
+    )
+    carts_count = PositiveIntegerField(
+        verbose_name='Times added to cart',
+        default=0,
+        editable=False,
+    )
+    trending_score = FloatField(
+        verbose_name='Trending score',
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Search document',
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Recipe'
         verbose_name_plural = 'Recipes'
         ordering = ('-pub_date', )
+        indexes = [
+            Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx',
+            ),
+            Index(
+                fields=('author', '-pub_date', '-id'),
+                name='recipe_author_pub_date_idx',
+            ),
+            Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_popular_idx',
+            ),
+            Index(
+                fields=('-trending_score', '-id'),
+                name='recipe_trending_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.name}. Author: {self.author.username}'
@@ -143,6 +202,15 @@ class IngredientAmount(Model):
         verbose_name = 'Ingredient',
         verbose_name_plural = 'Ingredients',
         ordering = ('recipe', )
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'recipe',
+                    'ingredients',
+                ),
+                name='unique_ingredientamount_recipe_ingredients',
+            )
+        ]
 
     def __str__(self) -> str:
         return f'{self.amount} {self.ingredients}'
@@ -160,6 +228,11 @@ class Favorite(Model):
         related_name='favorites',
         verbose_name='Recipe',
     )
+    added_at = DateTimeField(
+        verbose_name='Added at',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     class Meta:
         ordering = ('-id',)
@@ -192,6 +265,11 @@ class ShoppingCart(Model):
         related_name='shoppingcart',
         verbose_name='Recipe',
     )
+    added_at = DateTimeField(
+        verbose_name='Added at',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     class Meta:
         ordering = ('-id',)
@@ -208,3 +286,162 @@ class ShoppingCart(Model):
 
     def __str__(self):
         return f'{self.user} added recipe {self.recipe}'
+
+
+class ShoppingListItem(Model):
+    user = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='shopping_list',
+        verbose_name='User',
+    )
+    ingredient = ForeignKey(
+        Ingredient,
+        on_delete=CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='Ingredient',
+    )
+    amount = PositiveIntegerField(
+        verbose_name='Total amount',
+        default=0,
+    )
+
+    class Meta:
+        ordering = ('ingredient__name',)
+        verbose_name = 'Shopping list item'
+        verbose_name_plural = 'Shopping list items'
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'user',
+                    'ingredient',
+                ),
+                name='unique_shoppinglistitem_user_ingredient',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.amount} {self.ingredient}'
+
+
+class FeedEntry(Model):
+    user = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='feed',
+        verbose_name='Reader',
+    )
+    recipe = ForeignKey(
+        Recipe,
+        on_delete=CASCADE,
+        related_name='feed_entries',
+        verbose_name='Recipe',
+    )
+
+    class Meta:
+        ordering = ('-recipe',)
+        verbose_name = 'Feed entry'
+        verbose_name_plural = 'Feed entries'
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'user',
+                    'recipe',
+                ),
+                name='unique_feedentry_user_recipe',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} in the feed of {self.user}'
+
+
+class RankingRun(Model):
+    computed_at = DateTimeField(
+        verbose_name='Activity counted up to',
+        db_index=True,
+    )
+    recipes = PositiveIntegerField(
+        verbose_name='Recipes rescored',
+        default=0,
+    )
+
+    class Meta:
+        ordering = ('-computed_at',)
+        verbose_name = 'Ranking run'
+        verbose_name_plural = 'Ranking runs'
+
+    def __str__(self):
+        return f'Rankings as of {self.computed_at:%Y-%m-%d %H:%M}'
+
+
+class RecipeBand(Model):
+    recipe = ForeignKey(
+        Recipe,
+        on_delete=CASCADE,
+        related_name='bands',
+        verbose_name='Recipe',
+    )
+    band = PositiveSmallIntegerField(
+        verbose_name='MinHash band',
+    )
+    bucket = BigIntegerField(
+        verbose_name='Band bucket',
+    )
+
+    class Meta:
+        verbose_name = 'Recipe band'
+        verbose_name_plural = 'Recipe bands'
+        indexes = [
+            Index(
+                fields=('band', 'bucket'),
+                name='recipeband_bucket_idx',
+            ),
+        ]
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'recipe',
+                    'band',
+                ),
+                name='unique_recipeband_recipe_band',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} band {self.band}: {self.bucket}'
+
+
+class SimilarRecipe(Model):
+    recipe = ForeignKey(
+        Recipe,
+        on_delete=CASCADE,
+        related_name='similar_recipes',
+        verbose_name='Recipe',
+    )
+    similar = ForeignKey(
+        Recipe,
+        on_delete=CASCADE,
+        related_name='similar_to',
+        verbose_name='Similar recipe',
+    )
+    score = FloatField(
+        verbose_name='Similarity',
+    )
+
+    class Meta:
+        ordering = ('-score', '-similar')
+        verbose_name = 'Similar recipe'
+        verbose_name_plural = 'Similar recipes'
+        constraints = [
+            UniqueConstraint(
+                fields=(
+                    'recipe',
+                    'similar',
+                ),
+                name='unique_similarrecipe_recipe_similar',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.similar} is like {self.recipe} ({self.score:.2f})'
@@ -0,0 +1,81 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .catalog import purge_surrogate_keys
+from .models import Favorite, RankingRun, Recipe, ShoppingCart
+
+# Rows saved this recently may still sit in uncommitted transactions.
+SETTLE_TIME = timedelta(seconds=30)
+
+
+def decay(age):
+    """Weight left to activity that is ``age`` old."""
+    half_life = timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+    return 0.5 ** (age / half_life)
+
+
+def trending_floor():
+    """Score of a lone favourite as it leaves the trending window."""
+    return settings.TRENDING_FAVORITE_WEIGHT * decay(
+        timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    )
+
+
+def recent_activity(since, until):
+    """Favourites and cart adds in ``(since, until]``, decayed to ``until``."""
+    scores = Counter()
+    for model, weight in (
+        (Favorite, settings.TRENDING_FAVORITE_WEIGHT),
+        (ShoppingCart, settings.TRENDING_CART_WEIGHT),
+    ):
+        for recipe_id, added_at in model.objects.filter(
+            added_at__gt=since, added_at__lte=until
+        ).values_list('recipe_id', 'added_at').iterator():
+            scores[recipe_id] += weight * decay(until - added_at)
+    return scores
+
+
+@transaction.atomic
+def recompute_rankings():
+    """Move trending scores forward to now and return the recipes rescored.
+
+    Stored scores are decayed as of the previous run, so a run only ages
+    the recipes that still score and adds activity newer than that run.
+    Popular ranking is the ``favorites_count`` counter and needs no run.
+    """
+    until = timezone.now() - SETTLE_TIME
+    last_run = RankingRun.objects.first()
+    if last_run is None:
+        since = until - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    elif last_run.computed_at < until:
+        since = last_run.computed_at
+    else:
+        return 0
+
+    factor = decay(until - since)
+    scored = Recipe.objects.filter(trending_score__gt=0)
+    if factor:
+        scored.filter(
+            trending_score__lt=trending_floor() / factor
+        ).update(trending_score=0)
+        scored.update(trending_score=F('trending_score') * factor)
+    else:
+        scored.update(trending_score=0)
+
+    scores = recent_activity(since, until)
+    recipes = list(Recipe.objects.filter(pk__in=scores).only(
+        'pk', 'trending_score'
+    ))
+    for recipe in recipes:
+        recipe.trending_score += scores[recipe.pk]
+    Recipe.objects.bulk_update(
+        recipes, ('trending_score',), batch_size=settings.FEED_BATCH_SIZE
+    )
+    RankingRun.objects.create(computed_at=until, recipes=len(recipes))
+    purge_surrogate_keys('recipes:list')
+    return len(recipes)
@@ -0,0 +1,91 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection, connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+SEARCH_TABLE = 'recipes_recipe_fts'
+# bm25() column weights on SQLite, in (name, text) order.
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+
+def search_document():
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector('text', weight='B', config=config)
+    )
+
+
+def index_recipes(recipe_ids=None):
+    """Refresh the stored search document of the given (or all) recipes."""
+    if connection.vendor == 'postgresql':
+        recipes = Recipe.objects.all()
+        if recipe_ids is not None:
+            recipes = recipes.filter(id__in=recipe_ids)
+        recipes.update(search_vector=search_document())
+    elif connection.vendor == 'sqlite':
+        recipes = Recipe.objects.values_list('id', 'name', 'text')
+        with connection.cursor() as cursor:
+            if recipe_ids is None:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            else:
+                recipes = recipes.filter(id__in=recipe_ids)
+                cursor.executemany(
+                    f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                    [(recipe_id,) for recipe_id in recipe_ids],
+                )
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, name, text) '
+                'VALUES (%s, %s, %s)',
+                recipes.iterator(),
+            )
+
+
+def unindex_recipe(recipe_id):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (recipe_id,)
+            )
+
+
+def fts_query(query):
+    """Quote every word of a user query as an FTS5 prefix term."""
+    return ' '.join(
+        '"{}"*'.format(word) for word in re.findall(r'\w+', query)
+    )
+
+
+def search_recipes(queryset, query):
+    """Filter ``queryset`` by ``query``, best matches first."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        search_query = SearchQuery(
+            query, config=settings.SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-search_rank', 'id')
+    if vendor == 'sqlite':
+        match = fts_query(query)
+        if not match:
+            return queryset.none()
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            (match,),
+        )).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s '
+            f'AND rowid = {Recipe._meta.db_table}.id',
+            (match,),
+        )).order_by('-search_rank', 'id')
+    return queryset.filter(
+        Q(name__icontains=query) | Q(text__icontains=query)
+    )
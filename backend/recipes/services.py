@@ -0,0 +1,150 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from users.models import Subscription, User
+
+from .models import (Favorite, IngredientAmount, Recipe, ShoppingCart,
+                     ShoppingListItem)
+
+
+def recipe_amounts(recipe):
+    """Total amount per ingredient id used by the recipe."""
+    return Counter(dict(
+        IngredientAmount.objects.filter(recipe=recipe).values_list(
+            'ingredients_id'
+        ).annotate(total=Sum('amount')).order_by()
+    ))
+
+
+def cart_amounts(user_ids=None):
+    """Expected shopping list totals keyed by (user id, ingredient id)."""
+    carts = ShoppingCart.objects.all()
+    if user_ids is not None:
+        carts = carts.filter(user_id__in=user_ids)
+    return Counter({
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in carts.values_list(
+            'user_id', 'recipe__recipes__ingredients_id'
+        ).annotate(total=Sum('recipe__recipes__amount')).order_by()
+        if ingredient_id is not None
+    })
+
+
+@transaction.atomic
+def update_shopping_lists(user_ids, deltas):
+    """Add ``{ingredient_id: delta}`` to every listed user's shopping list."""
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not user_ids or not deltas:
+        return
+    # Rows that don't exist yet can't be locked. Insert them empty first
+    # so a concurrent request for the same ingredient waits on the row
+    # lock below instead of failing on the unique constraint.
+    ShoppingListItem.objects.bulk_create((
+        ShoppingListItem(
+            user_id=user_id, ingredient_id=ingredient_id, amount=0
+        )
+        for user_id in user_ids
+        for ingredient_id, delta in deltas.items()
+        if delta > 0
+    ), ignore_conflicts=True)
+    items = {
+        (item.user_id, item.ingredient_id): item
+        for item in ShoppingListItem.objects.select_for_update().filter(
+            user_id__in=user_ids, ingredient_id__in=deltas
+        )
+    }
+    created, changed, emptied = [], [], []
+    for user_id in user_ids:
+        for ingredient_id, delta in deltas.items():
+            item = items.get((user_id, ingredient_id))
+            if item is None:
+                if delta > 0:
+                    created.append(ShoppingListItem(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        amount=delta,
+                    ))
+                continue
+            item.amount += delta
+            if item.amount > 0:
+                changed.append(item)
+            else:
+                emptied.append(item.id)
+    ShoppingListItem.objects.bulk_create(created)
+    ShoppingListItem.objects.bulk_update(changed, ('amount',))
+    ShoppingListItem.objects.filter(id__in=emptied).delete()
+
+
+def recipe_ingredients_changed(recipe, deltas):
+    """Apply ``{ingredient_id: delta}`` to carts holding ``recipe``."""
+    user_ids = list(recipe.shoppingcart.values_list('user_id', flat=True))
+    update_shopping_lists(user_ids, deltas)
+
+
+@transaction.atomic
+def rebuild_shopping_lists(user_ids=None):
+    """Recompute shopping lists from carts and return the drifted keys."""
+    expected = cart_amounts(user_ids)
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    actual = Counter({
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in items.values_list(
+            'user_id', 'ingredient_id', 'amount'
+        )
+    })
+    drift = {
+        key: (actual[key], expected[key])
+        for key in set(actual) | set(expected)
+        if actual[key] != expected[key]
+    }
+    if drift:
+        items.delete()
+        ShoppingListItem.objects.bulk_create(
+            ShoppingListItem(
+                user_id=user_id, ingredient_id=ingredient_id, amount=amount
+            )
+            for (user_id, ingredient_id), amount in expected.items()
+        )
+    return drift
+
+
+def update_counter(model, pk, field, delta):
+    """Atomically move a denormalized counter without reading it."""
+    rows = model.objects.filter(pk=pk)
+    if delta < 0:
+        rows = rows.filter(**{f'{field}__gte': -delta})
+    rows.update(**{field: F(field) + delta})
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Subscription, 'author'),
+)
+
+
+@transaction.atomic
+def recount_counters():
+    """Recount every denormalized counter and return the drift per field."""
+    drift = {}
+    for model, field, counted, relation in COUNTERS:
+        expected = count_of(counted, relation)
+        drift[f'{model._meta.model_name}.{field}'] = model.objects.annotate(
+            expected=expected
+        ).exclude(**{field: F('expected')}).count()
+        model.objects.update(**{field: expected})
+    return drift
@@ -0,0 +1,101 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import Subscription
+
+from .catalog import bump_catalog_version
+from .feed import backfill, schedule_fan_out
+from .images import schedule_renditions
+from .models import FeedEntry, Ingredient, Recipe, ShoppingCart, Tag
+from .search import index_recipes, unindex_recipe
+from .services import (COUNTERS, recipe_amounts, update_counter,
+                       update_shopping_lists)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_catalog_changed(**kwargs):
+    bump_catalog_version('ingredients')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_catalog_changed(**kwargs):
+    bump_catalog_version('tags')
+
+
+@receiver(post_save, sender=ShoppingCart)
+def recipe_added_to_cart(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_shopping_lists(
+            (instance.user_id,), recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def recipe_removed_from_cart(instance, **kwargs):
+    amounts = recipe_amounts(instance.recipe_id)
+    update_shopping_lists(
+        (instance.user_id,),
+        {ingredient_id: -amount for ingredient_id, amount in amounts.items()},
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(instance, raw=False, **kwargs):
+    if (
+        not raw and instance.image
+        and instance.renditions.get('source') != instance.image.name
+    ):
+        schedule_renditions(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        schedule_fan_out(instance)
+
+
+@receiver(post_save, sender=Subscription)
+def author_followed(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def author_unfollowed(instance, **kwargs):
+    FeedEntry.objects.filter(
+        user_id=instance.user_id, recipe__author_id=instance.author_id
+    ).delete()
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_text_saved(instance, raw=False, **kwargs):
+    if not raw:
+        index_recipes((instance.pk,))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(instance, **kwargs):
+    unindex_recipe(instance.pk)
+
+
+COUNTERS_BY_SENDER = defaultdict(list)
+for model, field, counted, relation in COUNTERS:
+    COUNTERS_BY_SENDER[counted].append((model, field, f'{relation}_id'))
+
+
+def counted_row_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        for model, field, attribute in COUNTERS_BY_SENDER[sender]:
+            update_counter(model, getattr(instance, attribute), field, 1)
+
+
+def counted_row_deleted(sender, instance, **kwargs):
+    for model, field, attribute in COUNTERS_BY_SENDER[sender]:
+        update_counter(model, getattr(instance, attribute), field, -1)
+
+
+for sender in COUNTERS_BY_SENDER:
+    post_save.connect(counted_row_created, sender=sender)
+    post_delete.connect(counted_row_deleted, sender=sender)
@@ -0,0 +1,238 @@
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from hashlib import blake2b
+from heapq import nsmallest
+from itertools import islice
+from operator import or_
+from random import Random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .models import IngredientAmount, Recipe, RecipeBand, SimilarRecipe
+from .workers import run_after_commit
+
+# 30 bands of 2 hashes: recipes sharing a third of their ingredients
+# collide in some band with ~97% probability, a quarter with ~86%.
+BANDS = 30
+ROWS = 2
+# Buckets of a few very common ingredients hold recipes that share
+# little else; past this size they are not worth scanning.
+BUCKET_LIMIT = 1000
+PRIME = (1 << 61) - 1
+BATCH_SIZE = 1000
+_random = Random(20221001)
+COEFFICIENTS = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME))
+    for _ in range(BANDS * ROWS)
+]
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='similarity')
+
+
+def recipe_features(recipe_ids=None):
+    """Ingredient and tag ids of recipes as one integer set per recipe."""
+    amounts = IngredientAmount.objects.all()
+    tags = Recipe.tags.through.objects.all()
+    if recipe_ids is not None:
+        amounts = amounts.filter(recipe_id__in=recipe_ids)
+        tags = tags.filter(recipe_id__in=recipe_ids)
+    features = defaultdict(set)
+    for recipe_id, ingredient_id in amounts.values_list(
+        'recipe_id', 'ingredients_id'
+    ).iterator():
+        features[recipe_id].add(2 * ingredient_id)
+    for recipe_id, tag_id in tags.values_list(
+        'recipe_id', 'tag_id'
+    ).iterator():
+        features[recipe_id].add(2 * tag_id + 1)
+    return features
+
+
+def band_buckets(features):
+    """LSH bucket of each MinHash band of a recipe's ingredients.
+
+    Tags are left out of the signature: with a handful of tags shared
+    by most recipes they would fill buckets with unrelated recipes.
+    They still count towards the exact similarity of candidates.
+    """
+    ingredients = [feature for feature in features if not feature % 2]
+    if not ingredients:
+        return []
+    signature = [
+        min((a * feature + b) % PRIME for feature in ingredients)
+        for a, b in COEFFICIENTS
+    ]
+    return [
+        int.from_bytes(blake2b(b''.join(
+            value.to_bytes(8, 'big')
+            for value in signature[band * ROWS:(band + 1) * ROWS]
+        ), digest_size=8).digest(), 'big', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second)
+
+
+def top_candidates(shared):
+    """Recipe ids sharing the most buckets, up to the candidate limit."""
+    return [recipe_id for recipe_id, _ in nsmallest(
+        settings.SIMILARITY_CANDIDATES, shared.items(),
+        key=lambda item: (-item[1], -item[0]),
+    )]
+
+
+def nearest(features, candidates):
+    """Candidates scored by Jaccard similarity, best first."""
+    scores = {
+        recipe_id: jaccard(features, candidate)
+        for recipe_id, candidate in candidates.items()
+    }
+    return sorted(
+        ((recipe_id, score) for recipe_id, score in scores.items() if score),
+        key=lambda item: (-item[1], -item[0]),
+    )
+
+
+def in_buckets(keys):
+    return RecipeBand.objects.filter(reduce(or_, (
+        Q(band=band, bucket=bucket) for band, bucket in keys
+    )))
+
+
+def stored_candidates(recipe_id, buckets):
+    """Top candidates for a recipe from the stored bands of the others."""
+    if not buckets:
+        return []
+    small = [
+        (band, bucket) for band, bucket, size in in_buckets(
+            enumerate(buckets)
+        ).values('band', 'bucket').annotate(size=Count('id')).values_list(
+            'band', 'bucket', 'size'
+        )
+        if size <= BUCKET_LIMIT
+    ]
+    if not small:
+        return []
+    return top_candidates(dict(in_buckets(small).exclude(
+        recipe_id=recipe_id
+    ).values('recipe_id').annotate(shared=Count('id')).values_list(
+        'recipe_id', 'shared'
+    )))
+
+
+def offer(recipe_id, scored):
+    """Put ``recipe_id`` into the neighbour lists it now ranks in."""
+    limit = settings.SIMILAR_RECIPES
+    lists = {
+        row['recipe_id']: row for row in SimilarRecipe.objects.filter(
+            recipe_id__in=[candidate for candidate, _ in scored]
+        ).values('recipe_id').annotate(size=Count('id'), lowest=Min('score'))
+    }
+    entries = [
+        SimilarRecipe(recipe_id=candidate, similar_id=recipe_id, score=score)
+        for candidate, score in scored
+        if candidate not in lists
+        or lists[candidate]['size'] < limit
+        or score > lists[candidate]['lowest']
+    ]
+    SimilarRecipe.objects.bulk_create(entries, ignore_conflicts=True)
+
+    ranked = defaultdict(list)
+    for pk, owner in SimilarRecipe.objects.filter(recipe_id__in=[
+        entry.recipe_id for entry in entries if entry.recipe_id in lists
+    ]).order_by('recipe_id', '-score', '-similar_id').values_list(
+        'id', 'recipe_id'
+    ):
+        ranked[owner].append(pk)
+    SimilarRecipe.objects.filter(id__in=[
+        pk for pks in ranked.values() for pk in pks[limit:]
+    ]).delete()
+
+
+@transaction.atomic
+def index_similarity(recipe_id):
+    """Re-band one recipe and refresh the neighbour lists it belongs to.
+
+    Lists the recipe drops out of after an edit stay one entry short
+    until their own recipe is indexed again.
+    """
+    features = recipe_features((recipe_id,))[recipe_id]
+    buckets = band_buckets(features)
+    RecipeBand.objects.filter(recipe_id=recipe_id).delete()
+    RecipeBand.objects.bulk_create(
+        RecipeBand(recipe_id=recipe_id, band=band, bucket=bucket)
+        for band, bucket in enumerate(buckets)
+    )
+
+    scored = nearest(features, recipe_features(
+        stored_candidates(recipe_id, buckets)
+    ))
+
+    SimilarRecipe.objects.filter(recipe_id=recipe_id).delete()
+    SimilarRecipe.objects.bulk_create(
+        SimilarRecipe(recipe_id=recipe_id, similar_id=similar, score=score)
+        for similar, score in scored[:settings.SIMILAR_RECIPES]
+    )
+    SimilarRecipe.objects.filter(similar_id=recipe_id).delete()
+    offer(recipe_id, scored)
+
+
+def schedule_similarity(recipe):
+    """Queue re-indexing of a created or edited recipe after commit."""
+    run_after_commit(executor, index_similarity, recipe.id)
+
+
+def bulk_insert(model, rows):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+def nearest_in_memory(recipe_id, recipe_buckets, members, features):
+    shared = Counter()
+    for key in enumerate(recipe_buckets):
+        if len(members[key]) <= BUCKET_LIMIT:
+            shared.update(members[key])
+    shared.pop(recipe_id, None)
+    return nearest(features[recipe_id], {
+        candidate: features[candidate]
+        for candidate in top_candidates(shared)
+    })[:settings.SIMILAR_RECIPES]
+
+
+@transaction.atomic
+def rebuild_similarity_index():
+    """Band every recipe and recompute all neighbour lists in memory."""
+    features = recipe_features()
+    buckets = {
+        recipe_id: band_buckets(features_of)
+        for recipe_id, features_of in features.items()
+    }
+    members = defaultdict(list)
+    for recipe_id, recipe_buckets in buckets.items():
+        for key in enumerate(recipe_buckets):
+            members[key].append(recipe_id)
+
+    RecipeBand.objects.all().delete()
+    bulk_insert(RecipeBand, (
+        RecipeBand(recipe_id=recipe_id, band=band, bucket=bucket)
+        for recipe_id, recipe_buckets in buckets.items()
+        for band, bucket in enumerate(recipe_buckets)
+    ))
+    SimilarRecipe.objects.all().delete()
+    bulk_insert(SimilarRecipe, (
+        SimilarRecipe(recipe_id=recipe_id, similar_id=similar, score=score)
+        for recipe_id, recipe_buckets in buckets.items()
+        for similar, score in nearest_in_memory(
+            recipe_id, recipe_buckets, members, features
+        )
+    ))
+    return len(buckets)
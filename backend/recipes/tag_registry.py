@@ -0,0 +1,41 @@
+from .catalog import CatalogSnapshot
+from .models import Tag
+
+
+class TagRegistry(CatalogSnapshot):
+    """Per-process tag catalog with id and slug lookups."""
+    catalog = 'tags'
+
+    def __init__(self):
+        super().__init__()
+        self._tags = []
+        self._by_id = {}
+        self._by_slug = {}
+
+    def load(self):
+        tags = list(Tag.objects.values('id', 'name', 'color', 'slug'))
+        self._tags = tags
+        self._by_id = {tag['id']: tag for tag in tags}
+        self._by_slug = {tag['slug']: tag for tag in tags}
+
+    def all(self):
+        self.refresh()
+        return self._tags
+
+    def get(self, pk):
+        self.refresh()
+        return self._by_id.get(pk)
+
+    def ids_for_slugs(self, slugs):
+        self.refresh()
+        return [
+            self._by_slug[slug]['id'] for slug in slugs
+            if slug in self._by_slug
+        ]
+
+
+tag_registry = TagRegistry()
+
+
+def tag_choices():
+    return [(tag['slug'], tag['name']) for tag in tag_registry.all()]
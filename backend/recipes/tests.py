@@ -0,0 +1,149 @@
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from users.models import Subscription, User
+
+from .models import Ingredient, IngredientAmount, Recipe
+
+
+class ImportIngredientsTests(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+
+    def test_json_is_read_across_chunk_boundaries(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'ingredients.json'
+            path.write_text(
+                '[{"name": "zzzebra", "measurement_unit": "шт."},\n'
+                ' {"name": "zzzucchini", "measurement_unit": "г"}]',
+                encoding='utf-8',
+            )
+            with patch(
+                'recipes.management.commands.import_ingredients.CHUNK_SIZE',
+                8,
+            ):
+                call_command('import_ingredients', path, stdout=StringIO())
+        self.assertEqual(
+            list(Ingredient.objects.filter(name__startswith='zzz').values_list(
+                'name', 'measurement_unit'
+            )),
+            [('zzzebra', 'шт.'), ('zzzucchini', 'г')],
+        )
+
+    def test_import_from_another_process_reaches_the_api(self):
+        response = self.client.get('/api/ingredients/', {'name': 'zzz'})
+        self.assertEqual(response.json(), [])
+        etag = response['ETag']
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'ingredients.csv'
+            path.write_text('zzzebra,шт.\nzzzucchini,г\n', encoding='utf-8')
+            # The command gets a process-local default cache of its own
+            # and shares only the response store with the server.
+            with override_settings(CACHES={
+                **settings.CACHES,
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.'
+                               'LocMemCache',
+                    'LOCATION': 'import-process',
+                },
+            }):
+                call_command('import_ingredients', path, stdout=StringIO())
+
+        response = self.client.get(
+            '/api/ingredients/', {'name': 'zzz'}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['name'] for item in response.json()],
+            ['zzzebra', 'zzzucchini'],
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL plans')
+class HotPathIndexTests(TestCase):
+    """The plans of the hot lookups go through the indexes added for them.
+
+    Sequential scans are switched off: on tables this small the planner
+    would rightly prefer them, and the point is that an index applies.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author = (
+            User.objects.create_user(
+                username=name, email=f'{name}@example.com',
+                password='password', first_name='First', last_name='Last',
+            )
+            for name in ('reader', 'writer')
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Salt', measurement_unit='g'
+        )
+        cls.recipe = Recipe.objects.create(
+            name='Recipe', author=cls.author,
+            image='recipe_images/recipe.jpg', text='text', cooking_time=5,
+        )
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_recipe_list_order(self):
+        self.assertUsesIndex(
+            Recipe.objects.order_by('-pub_date', '-id')[:6],
+            'recipe_pub_date_id_idx',
+        )
+
+    def test_newest_recipes_of_an_author(self):
+        self.assertUsesIndex(
+            Recipe.objects.filter(author=self.author).order_by(
+                '-pub_date', '-id'
+            )[:3],
+            'recipe_author_pub_date_idx',
+        )
+
+    def test_amount_of_an_ingredient_in_a_recipe(self):
+        self.assertUsesIndex(
+            IngredientAmount.objects.filter(
+                recipe=self.recipe, ingredients=self.ingredient
+            ).order_by(),
+            'unique_ingredientamount_recipe_ingredients',
+        )
+
+    def test_subscription_lookup(self):
+        self.assertUsesIndex(
+            Subscription.objects.filter(
+                user=self.user, author=self.author
+            ).order_by(),
+            'unique_subscription_user_author',
+        )
+
+    def test_case_insensitive_name_prefix(self):
+        self.assertUsesIndex(
+            Ingredient.objects.filter(name__istartswith='sa').order_by(),
+            'recipes_ingredient_upper_name_like',
+        )
+
+    def test_name_prefix(self):
+        self.assertUsesIndex(
+            Ingredient.objects.filter(name__startswith='Sa').order_by(),
+            'recipes_ingredient_name_like',
+        )
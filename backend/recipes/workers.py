@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+
+def in_worker(job, *args):
+    try:
+        job(*args)
+    finally:
+        connection.close()
+
+
+def run_after_commit(executor, job, *args):
+    """Run ``job(*args)`` on ``executor`` once the transaction commits.
+
+    With ``BACKGROUND_WORKERS`` off the job runs inline in the committing
+    thread instead, so a SQLite file never sees two writers at once.
+    """
+    if settings.BACKGROUND_WORKERS:
+        transaction.on_commit(lambda: executor.submit(in_worker, job, *args))
+    else:
+        transaction.on_commit(lambda: job(*args))
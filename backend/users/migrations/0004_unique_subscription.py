@@ -0,0 +1,35 @@
+# Generated by Django 3.2.15 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+
+def delete_duplicate_subscriptions(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    User = apps.get_model('users', 'User')
+    seen = set()
+    for subscription in Subscription.objects.order_by('id'):
+        key = (subscription.user_id, subscription.author_id)
+        if key not in seen:
+            seen.add(key)
+            continue
+        subscription.delete()
+        User.objects.filter(id=subscription.author_id).update(
+            subscribers_count=models.F('subscribers_count') - 1
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_subscriptions, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='subscription',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_subscription_user_author'),
+        ),
+    ]
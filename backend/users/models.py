@@ -40,6 +40,16 @@ class User(AbstractUser):
         help_text=('Must-fill form. '
                    'From 1 to 150 letters.'),
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Recipes published',
+        default=0,
+        editable=False,
+    )
+    subscribers_count = models.PositiveIntegerField(
+        verbose_name='Subscribers',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'User'
@@ -68,6 +78,15 @@ class Subscription(models.Model):
         ordering = ('-id',)
         verbose_name = 'Subscription'
         verbose_name_plural = 'Subscriptions'
+        constraints = [
+            models.UniqueConstraint(
+                fields=(
+                    'user',
+                    'author',
+                ),
+                name='unique_subscription_user_author',
+            )
+        ]
 
     def __str__(self):
         return f'{self.user}_to_{self.author}'
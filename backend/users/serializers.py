@@ -1,11 +1,23 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer, SerializerMethodField
 
+from api.fields import ImageRenditionsField
 from recipes.models import Recipe
 
 from .models import User
 
 
+def subscribed_authors(context):
+    """Author ids the requesting user follows, loaded once per context."""
+    if 'subscribed_authors' not in context:
+        user = context['request'].user
+        context['subscribed_authors'] = (
+            set(user.subscribers.values_list('author_id', flat=True))
+            if user.is_authenticated else set()
+        )
+    return context['subscribed_authors']
+
+
 class UserSerializer(ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
@@ -24,13 +36,7 @@ class UserSerializer(ModelSerializer):
         read_only_fields = 'is_subscribed',
 
     def get_is_subscribed(self, obj):
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.subscribers.filter(
-                author=obj,
-            ).exists()
-        )
+        return obj.id in subscribed_authors(self.context)
 
     def create(self, validated_data):
         user = User(
@@ -47,11 +53,12 @@ class UserSerializer(ModelSerializer):
 class GetRecipeSerializer(ModelSerializer):
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'tags', 'cooking_time',
-                  'is_favorited', 'is_in_shopping_cart')
+        fields = ('id', 'name', 'image', 'image_renditions', 'tags',
+                  'cooking_time', 'is_favorited', 'is_in_shopping_cart')
         read_only_fields = '__all__',
 
     def get_is_favorited(self, obj):
@@ -64,7 +71,6 @@ class GetRecipeSerializer(ModelSerializer):
 class UserSubscriptionSerializer(ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     recipes = GetRecipeSerializer(many=True)
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -77,16 +83,8 @@ class UserSubscriptionSerializer(ModelSerializer):
             'is_subscribed',
             'recipes',
             'recipes_count',
+            'subscribers_count',
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.subscribers.filter(
-                author=obj,
-            ).exists()
-        )
-
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        return obj.id in subscribed_authors(self.context)
@@ -1,6 +1,8 @@
 from djoser.views import UserViewSet as DjoserUserViewSet
 
-from django.db.models import OuterRef
+from django.db import IntegrityError, transaction
+from django.db.models import (Exists, OuterRef, Prefetch, Subquery,
+                              prefetch_related_objects)
 
 from rest_framework.status import (
     HTTP_201_CREATED,
@@ -9,42 +11,77 @@ from rest_framework.status import (
     HTTP_401_UNAUTHORIZED,
 )
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.decorators import cache_anonymous
+from api.mixins import ReplicaReadMixin
+from api.pagination import PageOrCursorPagination
+from recipes.models import Favorite, Recipe, ShoppingCart
+
 from .models import Subscription, User
 from .serializers import UserSerializer, UserSubscriptionSerializer
 
 
-class UserViewSet(DjoserUserViewSet):
+def author_recipes(request):
+    """Prefetch of each author's newest recipes, capped by recipes_limit.
+
+    The cap is a correlated ``LIMIT`` subquery, so every author's
+    recipes arrive in one query however many authors are on the page.
+    """
+    user = request.user
+    recipes = Recipe.objects.annotate(
+        is_favorited=Exists(Favorite.objects.filter(
+            user=user, recipe=OuterRef('id')
+        )),
+        is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+            user=user, recipe=OuterRef('id')
+        )),
+    ).prefetch_related('tags').order_by('-pub_date', '-id')
+    limit = request.query_params.get('recipes_limit', '')
+    if limit.isdecimal():
+        newest = Recipe.objects.filter(
+            author_id=OuterRef('author_id')
+        ).order_by('-pub_date', '-id').values('id')[:int(limit)]
+        recipes = recipes.filter(id__in=Subquery(newest))
+    return Prefetch('recipes', queryset=recipes)
+
+
+class UserViewSet(ReplicaReadMixin, DjoserUserViewSet):
     queryset = User.objects.all().order_by('id')
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     serializer_class = UserSerializer
 
+    def surrogate_keys(self, request, data):
+        return (f'author:{data["id"]}',)
+
+    @cache_anonymous(surrogate_keys)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(
         detail=True,
         methods=['POST', 'DELETE'],
         url_path='subscribe',
         permission_classes=[IsAuthenticated],
     )
-    def subscribe(self, request):
+    def subscribe(self, request, **kwargs):
         if request.method == 'POST':
             user = request.user
             author = self.get_object()
             if user == author:
                 data = {'errors': 'You cannot subscribe to yourself.'}
                 return Response(data, status=HTTP_400_BAD_REQUEST)
-            if Subscription.objects.filter(
-                user=user,
-                author=author,
-            ).exists():
+            try:
+                with transaction.atomic():
+                    Subscription.objects.create(
+                        user=user,
+                        author=author,
+                    )
+            except IntegrityError:
                 data = {'errors': 'You have already subscribed to the author.'}
                 return Response(data, status=HTTP_400_BAD_REQUEST)
-            Subscription.objects.create(
-                user=user,
-                author=author,
-            )
+            prefetch_related_objects([author], author_recipes(request))
             serializer = UserSubscriptionSerializer(
                 author,
                 context={'request': request},
@@ -76,9 +113,9 @@ class UserViewSet(DjoserUserViewSet):
         subscribed_to_authors = Subscription.objects.filter(
             user=user, author=OuterRef('id')
         )
-        subscriptions = User.objects.all().filter(
+        subscriptions = User.objects.filter(
             id__in=(subscribed_to_authors.values('author_id'))
-        )
+        ).prefetch_related(author_recipes(request))
         pages = self.paginate_queryset(subscriptions)
         serializer = UserSubscriptionSerializer(
             pages, many=True, context={'request': request}